@@ -1,32 +1,66 @@
-import json
+import asyncio
 import logging
-
-from fastapi import Depends, FastAPI, Request, Response
-
-from infra_agent.models.grafana import GrafanaWebhookPayload
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Dict
+
+import msgspec
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request, Response
+
+from infra_agent.models.grafana import grafana_alert_summaries
+from infra_agent.models.k8s import NODE_ADAPTER, POD_ADAPTER, Node, Pod
+from infra_agent.providers.gl import close_session as close_gitlab_session
+from infra_agent.providers.grafana import close_session as close_grafana_session
+from infra_agent.providers.k8s import close_api_client as close_kubernetes_client
 from infra_agent.settings import settings
-from infra_agent.workers.ai import gpt_query
+from infra_agent.workers.ai import cached_gpt_query
+
+_HEALTH_PATHS = frozenset({"/healthz/live", "/healthz/ready"})
 
 
 class EndpointFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
-        path = ""
-        if record.args and isinstance(record.args, dict):
-            path = record.args.get("path", "")
-        elif record.args and isinstance(record.args, tuple) and len(record.args) >= 3:
-            path = record.args[2] if isinstance(record.args[2], str) else ""
-        return path not in ("/healthz/live", "/healthz/ready")
+        args = record.args
+        if not args:
+            return True
+        if type(args) is tuple:
+            return len(args) < 3 or args[2] not in _HEALTH_PATHS
+        if type(args) is dict:
+            return args.get("path") not in _HEALTH_PATHS
+        return True
+
+
+logging.getLogger("uvicorn.access").addFilter(EndpointFilter())
 
+logger = logging.getLogger(__name__)
 
-logger = logging.getLogger("uvicorn.access")
-logger.addFilter(EndpointFilter())
+_agent_semaphore = asyncio.Semaphore(settings.AGENT_MAX_CONCURRENT_RUNS)
 
-app = FastAPI()
+_GRAFANA_PROMPT = settings.GRAFANA_WEBHOOK_PROMPT_FORMAT
+_GRAFANA_SYSTEM_PROMPT = settings.GRAFANA_WEBHOOK_SYSTEM_PROMPT_FORMAT
+_OPENAI_MODEL = settings.OPENAI_MODEL
+_OPENAI_PROMPT_CACHE = settings.OPENAI_PROMPT_CACHE
 
 
-async def get_body(request: Request):
-    bytes = await request.body()
-    return bytes.decode("utf-8")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # worker threads running blocking client calls (python-gitlab) via asyncio.to_thread
+    executor = ThreadPoolExecutor(max_workers=settings.BLOCKING_CALLS_MAX_WORKERS)
+    asyncio.get_running_loop().set_default_executor(executor)
+    # build deferred schemas of the largest tool models up front, not on the first alert
+    for model in (Pod, Node):
+        model.model_rebuild()
+    for adapter in (POD_ADAPTER, NODE_ADAPTER):
+        adapter.rebuild()
+    yield
+    await close_grafana_session()
+    await close_gitlab_session()
+    await close_kubernetes_client()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(lifespan=lifespan)
 
 
 @app.get("/healthz/live")
@@ -39,32 +73,39 @@ async def readiness() -> Response:
     return Response("{}", status_code=200)
 
 
-@app.post("/webhooks/grafana")
-async def grafana_webhook(payload: GrafanaWebhookPayload) -> Response:
-    alert_summaries = payload.model_dump(exclude_none=True)
+async def _process_grafana_alerts(alert_summaries: Dict[str, Any]) -> None:
+    async with _agent_semaphore:
+        try:
+            result = await cached_gpt_query(
+                _GRAFANA_PROMPT,
+                _GRAFANA_SYSTEM_PROMPT,
+                model=_OPENAI_MODEL,
+                cache_prompt=_OPENAI_PROMPT_CACHE,
+                alert_summaries=alert_summaries,
+            )
+        except Exception as exc:
+            logger.error(f"Processing grafana alerts failed: {exc}")
+            return
+    logger.info(f"Grafana alerts processed: {result.model_dump_json(exclude_none=True)}")
 
-    prompt = settings.GRAFANA_WEBHOOK_PROMPT_FORMAT
-    system_prompt = settings.GRAFANA_WEBHOOK_SYSTEM_PROMPT_FORMAT
 
-    messages = []
-    result = await gpt_query(
-        prompt,
-        system_prompt,
-        messages,
-        model=settings.OPENAI_MODEL,
-        alert_summaries=alert_summaries,
-    )
-
-    return Response(
-        json.dumps(result.model_dump(exclude_none=True)),
-        media_type="application/json",
-        status_code=200,
-    )
+@app.post("/webhooks/grafana")
+async def grafana_webhook(request: Request, background_tasks: BackgroundTasks) -> Response:
+    # the full GrafanaWebhookPayload model isn't needed to build the prompt, skip validating it
+    try:
+        alert_summaries = grafana_alert_summaries(await request.body())
+    except msgspec.DecodeError as exc:
+        raise HTTPException(status_code=422, detail=f"Invalid Grafana webhook payload: {exc}")
+    background_tasks.add_task(_process_grafana_alerts, alert_summaries)
+    return Response("{}", media_type="application/json", status_code=202)
 
 
 if settings.DEBUG:
 
     @app.post("/debug")
-    def input_request(data: str = Depends(get_body)):
-        print(data)
+    async def input_request(request: Request):
+        async for chunk in request.stream():
+            sys.stdout.buffer.write(chunk)
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
         return Response("{}", status_code=200)
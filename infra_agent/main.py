@@ -12,6 +12,18 @@ def serve():
     kwargs = {}
     if settings.DEBUG:
         kwargs["reload"] = True
+    try:
+        import uvloop  # noqa: F401
+
+        kwargs["loop"] = "uvloop"
+    except ImportError:
+        logger.warning("uvloop not available, falling back to asyncio event loop")
+    try:
+        import httptools  # noqa: F401
+
+        kwargs["http"] = "httptools"
+    except ImportError:
+        logger.warning("httptools not available, falling back to h11")
     LOGGING_CONFIG["formatters"]["access"]["fmt"] = settings.LOG_FORMAT
     uvicorn.run("infra_agent.app:app", host=str(settings.HOST), port=settings.PORT, **kwargs)
 
@@ -1,48 +1,85 @@
-from typing import Callable, List
+from dataclasses import dataclass, field, fields, is_dataclass
+from typing import Any, Callable, List
 
 from pydantic import BaseModel, Field
 
 from infra_agent.models.generic import InfraAgentBaseModel
 
 
-class OpenAIToolParameterPropertyItems(InfraAgentBaseModel):
+def _as_dict(value: Any) -> Any:
+    if is_dataclass(value):
+        return {
+            f.metadata.get("alias", f.name): _as_dict(getattr(value, f.name))
+            for f in fields(value)
+            if not f.metadata.get("exclude") and getattr(value, f.name) is not None
+        }
+    if isinstance(value, dict):
+        return {k: _as_dict(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_as_dict(v) for v in value]
+    return value
+
+
+class OpenAIToolDefinition:
+    """Base for tool definitions built in code and only ever sent to the API (no input validation needed)."""
+
+    __slots__ = ()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Plain dict with `None` values skipped and API field names applied."""
+        return _as_dict(self)
+
+
+@dataclass(slots=True, kw_only=True)
+class OpenAIToolParameterPropertyItems(OpenAIToolDefinition):
     type: str = "string"
 
 
-class OpenAIToolParameterProperty(InfraAgentBaseModel):
+@dataclass(slots=True, kw_only=True)
+class OpenAIToolParameterProperty(OpenAIToolDefinition):
     type: str = "string"
     enum: List[str] | None = None
     description: str | None = None
     items: OpenAIToolParameterPropertyItems | None = None
-    additional_properties: dict[str, str] | None = Field(default=None, alias="additionalProperties")
-    min_properties: int | None = Field(default=None, alias="minProperties")
+    additional_properties: dict[str, str] | None = field(default=None, metadata={"alias": "additionalProperties"})
+    min_properties: int | None = field(default=None, metadata={"alias": "minProperties"})
 
 
-class OpenAIToolParameter(InfraAgentBaseModel):
+@dataclass(slots=True, kw_only=True)
+class OpenAIToolParameter(OpenAIToolDefinition):
     type: str = "object"
-    properties: dict[str, OpenAIToolParameterProperty] = {}
-    required: List[str] = []
+    properties: dict[str, OpenAIToolParameterProperty] = field(default_factory=dict)
+    required: List[str] = field(default_factory=list)
 
 
-class OpenAIFunction(InfraAgentBaseModel):
+@dataclass(slots=True, kw_only=True)
+class OpenAIFunction(OpenAIToolDefinition):
     name: str
     description: str
     parameters: OpenAIToolParameter | None = None
 
 
-class OpenAITool(InfraAgentBaseModel):
+@dataclass(slots=True, kw_only=True)
+class OpenAITool(OpenAIToolDefinition):
     type: str = "function"
     function: OpenAIFunction
-    handler: Callable | None = Field(default=None, exclude=True)
+    handler: Callable | None = field(default=None, metadata={"exclude": True})
 
 
-class OpenAIToolGroup(InfraAgentBaseModel):
+@dataclass(slots=True, kw_only=True)
+class OpenAIToolGroup(OpenAIToolDefinition):
     name: str
     description_template: str
     tools: List[OpenAITool]
+    _description: str = field(init=False, repr=False, metadata={"exclude": True})
+
+    def __post_init__(self):
+        self._description = self.description_template.format(
+            tool_list=f"[{','.join(tool.function.name for tool in self.tools)}]"
+        )
 
     def description(self):
-        return self.description_template.format(tool_list=f"[{','.join([tool.function.name for tool in self.tools])}]")
+        return self._description
 
 
 class OpenAIFunctionCall(InfraAgentBaseModel):
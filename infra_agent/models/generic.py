@@ -1,16 +1,22 @@
-from datetime import datetime
-from typing import Any
+import sys
+from typing import Annotated, Any, Dict
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import AfterValidator, BaseModel, ConfigDict
+
+
+def _intern_str_dict(value: Dict[str, str]) -> Dict[str, str]:
+    return {sys.intern(k): sys.intern(v) for k, v in value.items()}
+
+
+# label/annotation-like maps repeat the same keys and values across objects, keep a single copy of each string
+InternedStrDict = Annotated[Dict[str, str], AfterValidator(_intern_str_dict)]
 
 
 class InfraAgentBaseModel(BaseModel):
     """Base model with common configuration"""
 
-    model_config = ConfigDict(
-        populate_by_name=True,
-        json_encoders={datetime: lambda dt: dt.isoformat() if dt else None},
-    )
+    # schemas are built on first use (or explicitly at app startup) instead of at import
+    model_config = ConfigDict(populate_by_name=True, extra="ignore", defer_build=True)
 
 
 class SuccessPromptSummary(InfraAgentBaseModel):
@@ -22,6 +28,22 @@ class PromptToolErrorModel(InfraAgentBaseModel):
     error: str
     inputs: dict[str, Any]
     exception: str | None = None
+    retryable: bool = False
+
+
+# throttling and server side failures, a repeated call may succeed
+_RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _is_retryable(exception: BaseException | None) -> bool:
+    """Timeouts, connection failures and throttling/5xx responses are transient, anything else is permanent"""
+    if exception is None:
+        return False
+    if isinstance(exception, (TimeoutError, OSError)):
+        return True
+    # aiohttp and kubernetes errors carry `status`, python-gitlab errors `response_code`
+    status = getattr(exception, "status", None) or getattr(exception, "response_code", None)
+    return status in _RETRYABLE_STATUSES
 
 
 class PromptToolError(Exception):
@@ -33,10 +55,16 @@ class PromptToolError(Exception):
         self.inputs = inputs
         self.exception = exception
 
+    @property
+    def retryable(self) -> bool:
+        return _is_retryable(self.exception or self.__cause__)
+
     def model(self) -> PromptToolErrorModel:
+        exception = self.exception or self.__cause__
         return PromptToolErrorModel(
             tool_name=self.tool_name,
             error=str(self),
             inputs=self.inputs,
-            exception=str(self.exception) if self.exception else None,
+            exception=str(exception) if exception else None,
+            retryable=self.retryable,
         )
@@ -9,6 +9,7 @@ gl = gitlab.Gitlab(str(settings.GITLAB_URL), private_token=settings.GITLAB_TOKEN
 
 
 class GitlabMergeRequest(InfraAgentBaseModel):
+    # the project-scoped iid (`!123`), the id every merge request tool takes, not GitLab's global id
     id: int | None = None
     title: str
     state: str = "opened"
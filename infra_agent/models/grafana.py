@@ -1,76 +1,152 @@
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
-from pydantic import Field
+import msgspec
+from pydantic import ConfigDict, Field, model_validator
 
-from infra_agent.models.generic import InfraAgentBaseModel
+from infra_agent.models.generic import InfraAgentBaseModel, InternedStrDict
 
 
-class Alert(InfraAgentBaseModel):
-    # status: str
-    labels: Dict[str, str]
-    annotations: Dict[str, str]
-    # starts_at: datetime = Field(alias="startsAt")
-    # ends_at: datetime = Field(alias="endsAt")
+class GrafanaApiModel(InfraAgentBaseModel):
+    """Base for models parsed from Grafana payloads, which always use Grafana's own (camelCase) keys."""
+
+    model_config = ConfigDict(populate_by_name=False)
+
+
+class Alert(GrafanaApiModel):
+    status: str
+    labels: InternedStrDict
+    annotations: InternedStrDict
+    # starts_at: datetime = Field(validation_alias="startsAt")
+    # ends_at: datetime = Field(validation_alias="endsAt")
     # can be a relative query string like "?orgId=1"
-    # silence_url: str = Field(alias="silenceURL")
-    # dashboard_url: Optional[str] = Field(None, alias="dashboardURL")
-    # panel_url: Optional[str] = Field(None, alias="panelURL")
+    # silence_url: str = Field(validation_alias="silenceURL")
+    # dashboard_url: Optional[str] = Field(None, validation_alias="dashboardURL")
+    # panel_url: Optional[str] = Field(None, validation_alias="panelURL")
     values: Dict[str, Any] = Field(default_factory=dict)
 
 
-class GrafanaWebhookPayload(InfraAgentBaseModel):
+class GrafanaWebhookPayload(GrafanaApiModel):
     receiver: str
     status: str
-    # org_id: int = Field(alias="orgId")
+    # org_id: int = Field(validation_alias="orgId")
     alerts: List[Alert]
-    group_labels: Dict[str, str] = Field(default_factory=dict, alias="groupLabels")
-    common_labels: Dict[str, str] = Field(alias="commonLabels")
-    common_annotations: Dict[str, str] = Field(default_factory=dict, alias="commonAnnotations")
-    # external_url: HttpUrl = Field(alias="externalURL")
+    group_labels: InternedStrDict = Field(default_factory=dict, validation_alias="groupLabels")
+    common_labels: InternedStrDict = Field(validation_alias="commonLabels")
+    common_annotations: InternedStrDict = Field(default_factory=dict, validation_alias="commonAnnotations")
+    # external_url: str = Field(validation_alias="externalURL")
     # version: str
-    # group_key: str = Field(alias="groupKey")
-    # truncated_alerts: int = Field(alias="truncatedAlerts")
+    # group_key: str = Field(validation_alias="groupKey")
+    # truncated_alerts: int = Field(validation_alias="truncatedAlerts")
     title: str
     # state: str
     message: str
 
+    def summary(self) -> Dict[str, Any]:
+        """Compact view of the notification and its alerts passed to the prompt, empty fields left out."""
+        return _payload_summary(
+            status=self.status,
+            title=self.title,
+            message=self.message,
+            group_labels=self.group_labels,
+            common_labels=self.common_labels,
+            common_annotations=self.common_annotations,
+            alerts=[_alert_summary(a.status, a.annotations, a.labels, a.values) for a in self.alerts],
+        )
+
+
+def _alert_summary(
+    status: str | None, annotations: Dict[str, str], labels: Dict[str, str], values: Dict[str, Any]
+) -> Dict[str, Any]:
+    alert_summary = {"status": status, "annotations": annotations, "labels": labels, "values": values}
+    return {k: v for k, v in alert_summary.items() if v}
+
+
+def _payload_summary(**payload_summary: Any) -> Dict[str, Any]:
+    return {k: v for k, v in payload_summary.items() if v}
+
+
+class _WebhookAlert(msgspec.Struct):
+    status: str | None = None
+    labels: Dict[str, str] | None = None
+    annotations: Dict[str, str] | None = None
+    values: Dict[str, Any] | None = None
+
+
+class _WebhookPayload(msgspec.Struct, rename="camel"):
+    alerts: List[_WebhookAlert]
+    status: str | None = None
+    title: str | None = None
+    message: str | None = None
+    group_labels: Dict[str, str] | None = None
+    common_labels: Dict[str, str] | None = None
+    common_annotations: Dict[str, str] | None = None
+
 
-class GrafanaDatasource(InfraAgentBaseModel):
+_webhook_payload_decoder = msgspec.json.Decoder(_WebhookPayload)
+
+
+def grafana_alert_summaries(body: bytes) -> Dict[str, Any]:
+    """Same output as `GrafanaWebhookPayload.summary()`, decoded straight from the raw webhook body.
+
+    Raises `msgspec.DecodeError` if the body isn't a webhook payload.
+    """
+    payload = _webhook_payload_decoder.decode(body)
+    return _payload_summary(
+        status=payload.status,
+        title=payload.title,
+        message=payload.message,
+        group_labels=payload.group_labels,
+        common_labels=payload.common_labels,
+        common_annotations=payload.common_annotations,
+        alerts=[_alert_summary(a.status, a.annotations or {}, a.labels or {}, a.values or {}) for a in payload.alerts],
+    )
+
+
+class GrafanaDatasource(GrafanaApiModel):
     id: int
     uid: str
-    org_id: int = Field(alias="orgId")
+    org_id: int = Field(validation_alias="orgId")
     name: str
     type: str
 
 
-class GrafanaPrometheusQueryResultData(InfraAgentBaseModel):
-    metric: dict[str, str]
-    values: List[Tuple[int, float]]
-
+class GrafanaPrometheusQueryResultData(GrafanaApiModel):
+    """Single Prometheus series stored column-wise, `timestamps[i]` is the time of `values[i]`."""
 
-class GrafanaPrometheusQueryResult(InfraAgentBaseModel):
-    result_type: str = Field(alias="resultType")
+    metric: dict[str, str]
+    timestamps: List[int]
+    values: List[float]
+
+    @model_validator(mode="before")
+    @classmethod
+    def _split_values(cls, data: Any) -> Any:
+        # Prometheus sends `values` as [[ts, "value"], ...], drop the per-point pair objects,
+        # an instant query's single `value` pair becomes a one-point series
+        if isinstance(data, dict) and "timestamps" not in data:
+            pairs = data.get("values") or ((data["value"],) if data.get("value") else ())
+            data = {**data, "timestamps": [t for t, _ in pairs], "values": [v for _, v in pairs]}
+        return data
+
+
+class GrafanaPrometheusQueryResult(GrafanaApiModel):
+    result_type: str = Field(validation_alias="resultType")
     result: List[GrafanaPrometheusQueryResultData]
 
 
-class GrafanaPrometheusDatapoints(InfraAgentBaseModel):
-    datapoints: dict[int, float]
-
-
-class GrafanaPrometheusQueryOutput(InfraAgentBaseModel):
+class GrafanaPrometheusQueryOutput(GrafanaApiModel):
     status: str
     data: GrafanaPrometheusQueryResult
 
 
-class GrafanaAlertInstanceData(InfraAgentBaseModel):
+class GrafanaAlertInstanceData(GrafanaApiModel):
     """Container for the `data` field returned by Grafana alert instance APIs."""
 
-    values: Dict[str, float] | None = Field(default=None)
-    no_data: Optional[bool] = Field(False, alias="noData")
+    values: Dict[str, Any] | None = Field(default=None)
+    no_data: Optional[bool] = Field(False, validation_alias="noData")
 
 
-class GrafanaAlertInstance(InfraAgentBaseModel):
+class GrafanaAlertInstance(GrafanaApiModel):
     """Model for Grafana runtime alert instance (e.g. response from /api/ruler/...).
 
     Matches payloads like:
@@ -78,47 +154,47 @@ class GrafanaAlertInstance(InfraAgentBaseModel):
     """
 
     id: int
-    alert_id: int = Field(alias="alertId")
-    alert_name: str = Field(alias="alertName")
-    dashboard_id: int = Field(alias="dashboardId")
-    dashboard_uid: Optional[str] = Field("", alias="dashboardUID")
-    panel_id: int = Field(alias="panelId")
-    user_id: int = Field(alias="userId")
-    new_state: str = Field(alias="newState")
-    prev_state: str = Field(alias="prevState")
+    alert_id: int = Field(validation_alias="alertId")
+    alert_name: str = Field(validation_alias="alertName")
+    dashboard_id: int = Field(validation_alias="dashboardId")
+    dashboard_uid: Optional[str] = Field("", validation_alias="dashboardUID")
+    panel_id: int = Field(validation_alias="panelId")
+    user_id: int = Field(validation_alias="userId")
+    new_state: str = Field(validation_alias="newState")
+    prev_state: str = Field(validation_alias="prevState")
     created: int  # epoch ms
     updated: int  # epoch ms
     time: int  # epoch ms
-    time_end: int = Field(alias="timeEnd")  # epoch ms
+    time_end: int = Field(validation_alias="timeEnd")  # epoch ms
     text: Optional[str] = None
     tags: List[str] = Field(default_factory=list)
-    login: Optional[str] = Field("", alias="login")
-    email: Optional[str] = Field("", alias="email")
-    avatar_url: Optional[str] = Field("", alias="avatarUrl")
+    login: Optional[str] = Field("", validation_alias="login")
+    email: Optional[str] = Field("", validation_alias="email")
+    avatar_url: Optional[str] = Field("", validation_alias="avatarUrl")
     data: Optional[GrafanaAlertInstanceData] | None = None
 
 
-class _RelativeTimeRange(InfraAgentBaseModel):
+class _RelativeTimeRange(GrafanaApiModel):
     # JSON uses the key "from" which is a Python keyword, so alias it
-    from_: int = Field(alias="from")
+    from_: int = Field(validation_alias="from")
     to: int
 
 
-class _RuleDataModel(InfraAgentBaseModel):
+class _RuleDataModel(GrafanaApiModel):
     """Flexible container for the per-query `model` field in alert rules.
 
     Grafana's `model` is different between query types; make a permissive
     model that defines the common fields we expect but allows extras.
     """
 
-    editor_mode: Optional[str] = Field(None, alias="editorMode")
+    editor_mode: Optional[str] = Field(None, validation_alias="editorMode")
     expr: Optional[str] = None
     instant: Optional[bool] = None
-    interval_ms: Optional[int] = Field(None, alias="intervalMs")
-    legend_format: Optional[str] = Field(None, alias="legendFormat")
-    max_data_points: Optional[int] = Field(None, alias="maxDataPoints")
+    interval_ms: Optional[int] = Field(None, validation_alias="intervalMs")
+    legend_format: Optional[str] = Field(None, validation_alias="legendFormat")
+    max_data_points: Optional[int] = Field(None, validation_alias="maxDataPoints")
     range: Optional[bool] = None
-    ref_id: Optional[str] = Field(None, alias="refId")
+    ref_id: Optional[str] = Field(None, validation_alias="refId")
     # fields used by expression/reduce/math models
     conditions: Optional[List[Dict[str, Any]]] = None
     datasource: Optional[Dict[str, Any]] = None
@@ -131,33 +207,33 @@ class _RuleDataModel(InfraAgentBaseModel):
         extra = "allow"
 
 
-class _RuleDataItem(InfraAgentBaseModel):
-    ref_id: str = Field(alias="refId")
-    query_type: str = Field(alias="queryType")
-    relative_time_range: _RelativeTimeRange = Field(alias="relativeTimeRange")
-    datasource_uid: str = Field(alias="datasourceUid")
+class _RuleDataItem(GrafanaApiModel):
+    ref_id: str = Field(validation_alias="refId")
+    query_type: str = Field(validation_alias="queryType")
+    relative_time_range: _RelativeTimeRange = Field(validation_alias="relativeTimeRange")
+    datasource_uid: str = Field(validation_alias="datasourceUid")
     model: _RuleDataModel
 
 
-class GrafanaProvisioningAlertRule(InfraAgentBaseModel):
+class GrafanaProvisioningAlertRule(GrafanaApiModel):
     id: int
     uid: str
     # Grafana uses "orgID" (capital D) in this API
-    org_id: int = Field(alias="orgID")
-    folder_uid: str = Field(alias="folderUID")
-    rule_group: str = Field(alias="ruleGroup")
+    org_id: int = Field(validation_alias="orgID")
+    folder_uid: str = Field(validation_alias="folderUID")
+    rule_group: str = Field(validation_alias="ruleGroup")
     title: str
     condition: str
     data: List[_RuleDataItem]
     updated: Optional[datetime] = None
-    no_data_state: Optional[str] = Field(None, alias="noDataState")
-    exec_err_state: Optional[str] = Field(None, alias="execErrState")
+    no_data_state: Optional[str] = Field(None, validation_alias="noDataState")
+    exec_err_state: Optional[str] = Field(None, validation_alias="execErrState")
     # "for" is a reserved word in Python; alias to for_
-    for_: Optional[str] = Field(None, alias="for")
+    for_: Optional[str] = Field(None, validation_alias="for")
     keep_firing_for: Optional[str] = None
     annotations: Optional[Dict[str, str]] = None
     provenance: Optional[str] = None
-    is_paused: Optional[bool] = Field(None, alias="isPaused")
+    is_paused: Optional[bool] = Field(None, validation_alias="isPaused")
     notification_settings: Optional[Any] = None
     record: Optional[Any] = None
 
@@ -165,3 +241,13 @@ class GrafanaProvisioningAlertRule(InfraAgentBaseModel):
 class GrafanaNumericResult(InfraAgentBaseModel):
     result: float
     unit: str | None = None
+
+
+class GrafanaContainerUsage(InfraAgentBaseModel):
+    cpu: GrafanaNumericResult
+    memory: GrafanaNumericResult
+
+
+class GrafanaNodeUsage(InfraAgentBaseModel):
+    cpu: GrafanaPrometheusQueryOutput
+    memory: GrafanaPrometheusQueryOutput
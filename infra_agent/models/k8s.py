@@ -1,33 +1,52 @@
+import re
 from typing import Any, Dict, List, Optional
 
-from pydantic import Field
+from pydantic import ConfigDict, Field, TypeAdapter, field_validator
+from pydantic.alias_generators import to_camel
+from pydantic.dataclasses import dataclass
 
-from infra_agent.models.generic import InfraAgentBaseModel
+from infra_agent.models.generic import InfraAgentBaseModel, InternedStrDict
 
 
-class NodeAddress(InfraAgentBaseModel):
+class KubernetesModel(InfraAgentBaseModel):
+    """Base model for Kubernetes API objects, camelCase aliases are generated unless set explicitly"""
+
+    model_config = ConfigDict(alias_generator=to_camel)
+
+
+# small, never mutated models repeated per container/address - slotted dataclasses carry no per-instance __dict__
+leaf_dataclass = dataclass(
+    slots=True,
+    frozen=True,
+    kw_only=True,
+    config=ConfigDict(alias_generator=to_camel, populate_by_name=True, extra="ignore", defer_build=True),
+)
+
+
+@leaf_dataclass
+class NodeAddress:
     """Represents a node address in Kubernetes"""
 
     type: str
     address: str
 
 
-class NodeSystemInfo(InfraAgentBaseModel):
+class NodeSystemInfo(KubernetesModel):
     """Information about the node's system"""
 
     machine_id: Optional[str] = Field(None, alias="machineID")
     system_uuid: Optional[str] = Field(None, alias="systemUUID")
     boot_id: Optional[str] = Field(None, alias="bootID")
-    kernel_version: Optional[str] = Field(None, alias="kernelVersion")
-    os_image: Optional[str] = Field(None, alias="osImage")
-    container_runtime_version: Optional[str] = Field(None, alias="containerRuntimeVersion")
-    kubelet_version: Optional[str] = Field(None, alias="kubeletVersion")
-    kube_proxy_version: Optional[str] = Field(None, alias="kubeProxyVersion")
-    operating_system: Optional[str] = Field(None, alias="operatingSystem")
-    architecture: Optional[str] = Field(None, alias="architecture")
+    kernel_version: Optional[str] = None
+    os_image: Optional[str] = None
+    container_runtime_version: Optional[str] = None
+    kubelet_version: Optional[str] = None
+    kube_proxy_version: Optional[str] = None
+    operating_system: Optional[str] = None
+    architecture: Optional[str] = None
 
 
-class NodeCondition(InfraAgentBaseModel):
+class NodeCondition(KubernetesModel):
     """Represents a node condition"""
 
     type: str
@@ -37,61 +56,118 @@ class NodeCondition(InfraAgentBaseModel):
     reason: Optional[str] = None
     message: Optional[str] = None
 
-    # @property
-    # def heartbeat_at(self) -> Optional[datetime]:
-    #     """Return heartbeat time as datetime object"""
-    #     return self.last_heartbeat_time
 
-    # @property
-    # def transitioned_at(self) -> Optional[datetime]:
-    #     """Return transition time as datetime object"""
-    #     return self.last_transition_time
+# a decimal exponent ("129e6") is tried before the suffixes, a bare "E" is still the exa suffix
+_QUANTITY_RE = re.compile(r"^([+-]?[0-9.]+)([eE][+-]?[0-9]+|[a-zA-Z]*)$")
+_QUANTITY_MULTIPLIERS = {
+    "": 1,
+    "k": 1000,
+    "M": 1000**2,
+    "G": 1000**3,
+    "T": 1000**4,
+    "P": 1000**5,
+    "E": 1000**6,
+    "Ki": 1024,
+    "Mi": 1024**2,
+    "Gi": 1024**3,
+    "Ti": 1024**4,
+    "Pi": 1024**5,
+    "Ei": 1024**6,
+}
+
+
+# resources parsed into KubernetesCapacity fields, the rest are passed through as reported
+_PARSED_RESOURCES = frozenset(("cpu", "memory", "pods", "ephemeral-storage"))
+
+
+def _parse_quantity(quantity: str | None) -> float | None:
+    """Convert a Kubernetes resource quantity like "3800m", "16Gi", "129e6" or "110" to a plain number"""
+    if not quantity:
+        return None
+    match = _QUANTITY_RE.match(quantity)
+    if not match:
+        return None
+    number, suffix = match.groups()
+    if suffix[:1] in ("e", "E") and len(suffix) > 1:
+        return float(number + suffix)
+    if suffix == "m":
+        return float(number) / 1000
+    if suffix not in _QUANTITY_MULTIPLIERS:
+        return None
+    return float(number) * _QUANTITY_MULTIPLIERS[suffix]
+
+
+class KubernetesCapacity(KubernetesModel):
+    """Node resources with quantities already parsed: cpu in cores, memory and storage in bytes.
+
+    Any other resource (`nvidia.com/gpu`, `hugepages-2Mi`, device plugin resources) is kept under its own name
+    with the quantity string Kubernetes reported.
+    """
+
+    model_config = ConfigDict(extra="allow")
 
-
-class NodeStatus(InfraAgentBaseModel):
+    cpu: float | None = None
+    memory: int | None = None
+    pods: int | None = None
+    ephemeral_storage: int | None = None
+
+    @classmethod
+    def from_quantities(cls, quantities: Dict[str, str]) -> "KubernetesCapacity":
+        extended = {k: v for k, v in quantities.items() if k not in _PARSED_RESOURCES}
+        memory = _parse_quantity(quantities.get("memory"))
+        pods = _parse_quantity(quantities.get("pods"))
+        ephemeral_storage = _parse_quantity(quantities.get("ephemeral-storage"))
+        return cls(
+            cpu=_parse_quantity(quantities.get("cpu")),
+            memory=int(memory) if memory is not None else None,
+            pods=int(pods) if pods is not None else None,
+            ephemeral_storage=int(ephemeral_storage) if ephemeral_storage is not None else None,
+            **extended,
+        )
+
+
+class NodeStatus(KubernetesModel):
     """Status information about the node"""
 
-    capacity: Optional[dict[str, str]] = Field(default_factory=dict)
-    allocatable: Optional[dict[str, str]] = Field(default_factory=dict)
-    conditions: Optional[List[NodeCondition]] = Field(default_factory=list)
-    addresses: Optional[List[NodeAddress]] = Field(default_factory=list)
-    node_info: Optional[NodeSystemInfo] = Field(None, alias="nodeInfo")
+    capacity: Optional[KubernetesCapacity] = None
+    allocatable: Optional[KubernetesCapacity] = None
+    conditions: Optional[List[NodeCondition]] = None
+    addresses: Optional[List[NodeAddress]] = None
+    node_info: Optional[NodeSystemInfo] = None
     # images: Optional[List[Any]] = None
     # volumes_in_use: Optional[List[str]] = Field(None, alias="volumesInUse")
     # volumes_attached: Optional[List[Any]] = Field(None, alias="volumesAttached")
 
+    @field_validator("capacity", "allocatable", mode="before")
+    @classmethod
+    def _parse_quantities(cls, value: Any) -> Any:
+        # parsed once here, reports read plain numbers instead of re-parsing quantity strings
+        if isinstance(value, dict) and all(isinstance(v, str) for v in value.values()):
+            return KubernetesCapacity.from_quantities(value)
+        return value
 
-class NodeSpec(InfraAgentBaseModel):
+
+class NodeSpec(KubernetesModel):
     """Node specification"""
 
     pod_cidr: Optional[str] = Field(None, alias="podCIDR")
     pod_cidrs: Optional[List[str]] = Field(None, alias="podCIDRs")
-    provider_id: Optional[str] = Field(None, alias="providerId")
+    provider_id: Optional[str] = Field(None, alias="providerID")
     unschedulable: Optional[bool] = None
     taints: Optional[List[dict]] = None
 
 
-class NodeMetadata(InfraAgentBaseModel):
+class NodeMetadata(KubernetesModel):
     """Node metadata"""
 
     name: str
     # creation_timestamp: Optional[datetime] = Field(None, alias="creationTimestamp")
     # deletion_timestamp: Optional[datetime] = Field(None, alias="deletionTimestamp")
-    labels: Optional[dict[str, str]] = None
-    annotations: Optional[dict[str, str]] = None
-
-    # @property
-    # def created_at(self) -> Optional[datetime]:
-    #     """Return creation timestamp as datetime object"""
-    #     return self.creation_timestamp
+    labels: Optional[InternedStrDict] = None
+    annotations: Optional[InternedStrDict] = None
 
-    # @property
-    # def deleted_at(self) -> Optional[datetime]:
-    #     """Return deletion timestamp as datetime object"""
-    #     return self.deletion_timestamp
 
-
-class Node(InfraAgentBaseModel):
+class Node(KubernetesModel):
     """Represents a Kubernetes node"""
 
     metadata: NodeMetadata
@@ -99,29 +175,30 @@ class Node(InfraAgentBaseModel):
     status: Optional[NodeStatus] = None
 
 
-class KubernetesNodeList(InfraAgentBaseModel):
+class KubernetesNodeList(KubernetesModel):
     """List of Kubernetes nodes"""
 
     items: List[Node]
 
 
 # Pod-related models
-class ContainerPort(InfraAgentBaseModel):
+@leaf_dataclass
+class ContainerPort:
     """Container port specification"""
 
     name: Optional[str] = None
-    container_port: int = Field(alias="containerPort")
+    container_port: int
     protocol: Optional[str] = "TCP"
 
 
-class ResourceRequirements(InfraAgentBaseModel):
+class ResourceRequirements(KubernetesModel):
     """Container resource requirements"""
 
     limits: Optional[Dict[str, str]] = None
     requests: Optional[Dict[str, str]] = None
 
 
-class ContainerState(InfraAgentBaseModel):
+class ContainerState(KubernetesModel):
     """Container state information"""
 
     # running: Optional[Dict[str, datetime]] = None
@@ -129,38 +206,40 @@ class ContainerState(InfraAgentBaseModel):
     waiting: Optional[Dict[str, str]] = None
 
 
-class ContainerStatus(InfraAgentBaseModel):
+class ContainerStatus(KubernetesModel):
     """Container status information"""
 
     name: str
     state: Optional[ContainerState] = None
-    last_state: Optional[ContainerState] = Field(None, alias="lastState")
+    last_state: Optional[ContainerState] = None
     ready: bool
-    restart_count: int = Field(alias="restartCount")
+    restart_count: int
     image: str
     image_id: str = Field(alias="imageID")
     container_id: Optional[str] = Field(None, alias="containerID")
     started: Optional[bool] = None
-    allocated_resources: Optional[Dict[str, str]] = Field(None, alias="allocatedResources")
+    allocated_resources: Optional[Dict[str, str]] = None
 
 
-class VolumeMount(InfraAgentBaseModel):
+@leaf_dataclass
+class VolumeMount:
     """Volume mount specification"""
 
     name: str
-    mount_path: str = Field(alias="mountPath")
-    read_only: bool | None = Field(default=None, alias="readOnly")
-    recursive_read_only: str | None = Field(default=None, alias="recursiveReadOnly")
+    mount_path: str
+    read_only: bool | None = None
+    recursive_read_only: str | None = None
 
 
-class EnvVar(InfraAgentBaseModel):
+@leaf_dataclass
+class EnvVar:
     """Environment variable specification"""
 
     name: str
     # value: Optional[str] = None
 
 
-class Container(InfraAgentBaseModel):
+class Container(KubernetesModel):
     """Container specification"""
 
     name: str
@@ -168,88 +247,40 @@ class Container(InfraAgentBaseModel):
     ports: Optional[List[ContainerPort]] = None
     env: Optional[List[EnvVar]] = None
     resources: Optional[ResourceRequirements] = None
-    volume_mounts: Optional[List[VolumeMount]] = Field(None, alias="volumeMounts")
-    image_pull_policy: Optional[str] = Field(None, alias="imagePullPolicy")
-    security_context: Optional[Dict[str, Any]] = Field(None, alias="securityContext")
-    termination_message_path: Optional[str] = Field(None, alias="terminationMessagePath")
-    termination_message_policy: Optional[str] = Field(None, alias="terminationMessagePolicy")
-    liveness_probe: Optional[Dict[str, Any]] = Field(None, alias="livenessProbe")
-    readiness_probe: Optional[Dict[str, Any]] = Field(None, alias="readinessProbe")
-    startup_probe: Optional[Dict[str, Any]] = Field(None, alias="startupProbe")
+    volume_mounts: Optional[List[VolumeMount]] = None
+    image_pull_policy: Optional[str] = None
+    security_context: Optional[Dict[str, Any]] = None
+    liveness_probe: Optional[Dict[str, Any]] = None
+    readiness_probe: Optional[Dict[str, Any]] = None
+    startup_probe: Optional[Dict[str, Any]] = None
 
 
-class Volume(InfraAgentBaseModel):
+class Volume(KubernetesModel):
     """Volume specification"""
 
     name: str
-    empty_dir: Optional[Dict[str, Any]] = Field(None, alias="emptyDir")
-    host_path: Optional[Dict[str, str]] = Field(None, alias="hostPath")
+    empty_dir: Optional[Dict[str, Any]] = None
+    host_path: Optional[Dict[str, str]] = None
     # persistent_volume_claim: Optional[Dict[str, str]] = Field(None, alias="persistentVolumeClaim")
     projected: Optional[Dict[str, Any]] = None
 
 
-class NodeSelectorRequirement(InfraAgentBaseModel):
-    """Node selector requirement"""
-
-    key: str
-    operator: str
-    values: Optional[List[str]] = None
-
-
-class NodeSelectorTerm(InfraAgentBaseModel):
-    """Node selector term"""
-
-    match_expressions: Optional[List[NodeSelectorRequirement]] = Field(None, alias="matchExpressions")
-    match_fields: Optional[List[NodeSelectorRequirement]] = Field(None, alias="matchFields")
-
-
-class NodeSelector(InfraAgentBaseModel):
-    """Node selector"""
-
-    node_selector_terms: List[NodeSelectorTerm] = Field(alias="nodeSelectorTerms")
-
-
-class NodeAffinity(InfraAgentBaseModel):
-    """Node affinity specification"""
-
-    required_during_scheduling_ignored_during_execution: Optional[NodeSelector] = Field(
-        None, alias="requiredDuringSchedulingIgnoredDuringExecution"
-    )
-
-
-class Affinity(InfraAgentBaseModel):
-    """Affinity specification"""
-
-    node_affinity: Optional[NodeAffinity] = Field(None, alias="nodeAffinity")
-
-
-class Toleration(InfraAgentBaseModel):
-    """Toleration specification"""
-
-    key: Optional[str] = None
-    operator: Optional[str] = None
-    effect: Optional[str] = None
-    toleration_seconds: Optional[int] = Field(None, alias="tolerationSeconds")
-
-
-class PodSpec(InfraAgentBaseModel):
+class PodSpec(KubernetesModel):
     """Pod specification"""
 
     containers: List[Container]
     volumes: Optional[List[Volume]] = None
-    # affinity: Optional[Affinity] = None
-    node_name: Optional[str] = Field(None, alias="nodeName")
+    node_name: Optional[str] = None
     # service_account_name: Optional[str] = Field(None, alias="serviceAccountName")
     # service_account: Optional[str] = Field(None, alias="serviceAccount")
-    restart_policy: Optional[str] = Field(None, alias="restartPolicy")
+    restart_policy: Optional[str] = None
     # dns_policy: Optional[str] = Field(None, alias="dnsPolicy")
     # node_selector: Optional[Dict[str, str]] = Field(None, alias="nodeSelector")
-    security_context: Optional[Dict[str, Any]] = Field(None, alias="securityContext")
-    # tolerations: Optional[List[Toleration]] = None
+    security_context: Optional[Dict[str, Any]] = None
     # priority: Optional[int] = None
 
 
-class PodCondition(InfraAgentBaseModel):
+class PodCondition(KubernetesModel):
     """Pod condition information"""
 
     type: str
@@ -260,13 +291,7 @@ class PodCondition(InfraAgentBaseModel):
     message: Optional[str] = None
 
 
-class PodIP(InfraAgentBaseModel):
-    """Pod IP information"""
-
-    ip: str
-
-
-class PodStatus(InfraAgentBaseModel):
+class PodStatus(KubernetesModel):
     """Pod status information"""
 
     conditions: Optional[List[PodCondition]] = None
@@ -274,16 +299,16 @@ class PodStatus(InfraAgentBaseModel):
     # container_statuses: Optional[List[ContainerStatus]] = Field(None, alias="containerStatuses")
 
 
-class PodMetadata(InfraAgentBaseModel):
+class PodMetadata(KubernetesModel):
     """Pod metadata"""
 
     name: str
     namespace: Optional[str] = None
-    labels: Optional[Dict[str, str]] = None
-    annotations: Optional[Dict[str, str]] = None
+    labels: Optional[InternedStrDict] = None
+    annotations: Optional[InternedStrDict] = None
 
 
-class Pod(InfraAgentBaseModel):
+class Pod(KubernetesModel):
     """Represents a Kubernetes Pod"""
 
     metadata: PodMetadata
@@ -291,19 +316,19 @@ class Pod(InfraAgentBaseModel):
     status: Optional[PodStatus] = None
 
 
-class KubernetesAnyList(InfraAgentBaseModel):
+class KubernetesAnyList(KubernetesModel):
     """Generic Kubernetes list"""
 
     items: List[str]
 
 
-class PodList(InfraAgentBaseModel):
+class PodList(KubernetesModel):
     """List of Kubernetes pods"""
 
     items: List[Pod]
 
 
-class KubernetesPodLogs(InfraAgentBaseModel):
+class KubernetesPodLogs(KubernetesModel):
     """Kubernetes Pod logs"""
 
     container_name: str
@@ -312,20 +337,13 @@ class KubernetesPodLogs(InfraAgentBaseModel):
     logs: List[str]
 
 
-class KubernetesCapacity(InfraAgentBaseModel):
-    cpu: float | None = None
-    memory: str | None = None
-    pods: int | None = None
-    ephemeral_storage: str | None = None
-
-
-class KubernetesCapacityNodeReport(InfraAgentBaseModel):
+class KubernetesCapacityNodeReport(KubernetesModel):
     name: str
     capacity: KubernetesCapacity | None = None
     allocatable: KubernetesCapacity | None = None
 
 
-class HelmReleaseMetadata(InfraAgentBaseModel):
+class HelmReleaseMetadata(KubernetesModel):
     """Helm release metadata extracted from Kubernetes secret"""
 
     name: str
@@ -333,3 +351,8 @@ class HelmReleaseMetadata(InfraAgentBaseModel):
     chart_name: str
     default_values: str | None = None
     values: dict[str, str] | None = None
+
+
+# reused validators for the provider hot paths, schemas stay deferred until startup warm-up or first use
+POD_ADAPTER = TypeAdapter(Pod)
+NODE_ADAPTER = TypeAdapter(Node)
@@ -1,7 +1,23 @@
+import asyncio
 import logging
-from typing import Dict, List
+import time
+from functools import lru_cache
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
+import aiohttp
 import gitlab
+import orjson
+from gitlab.utils import EncodedId
 
 from infra_agent.models.generic import PromptToolError
 from infra_agent.models.gl import (
@@ -12,35 +28,147 @@ from infra_agent.models.gl import (
 )
 from infra_agent.settings import settings
 
-gl = gitlab.Gitlab(str(settings.GITLAB_URL), private_token=settings.GITLAB_TOKEN)
+_GITLAB_URL = str(settings.GITLAB_URL).rstrip("/")
+_GRAPHQL_URL = f"{_GITLAB_URL}/api/graphql"
+_PROJECT_PATH = settings.GITLAB_HELMFILE_PROJECT_PATH
+# url-quoted once, python-gitlab passes an EncodedId through instead of quoting the path on every request
+_PROJECT_ID = EncodedId(_PROJECT_PATH)
+
+gl = gitlab.Gitlab(_GITLAB_URL, private_token=settings.GITLAB_TOKEN)
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+_SOURCE_TREE_CACHE_TTL = 60
+
+# GitLab's maximum page size (python-gitlab defaults to 20), repository trees also support keyset pagination
+_PER_PAGE = 100
+_TREE_PAGINATION = {"per_page": _PER_PAGE, "pagination": "keyset"}
+
+# files read repeatedly within one agent run, dropped for the paths this module writes
+_FILE_CONTENTS_CACHE_TTL = 30
+_FILE_CONTENTS_CACHE_MAX_SIZE = 256
+_file_contents_cache: Dict[Tuple[str, str], Tuple[float, GitlabFile]] = {}
+
+# caps in-flight GitLab calls so concurrent tool calls and fan-outs stay under GitLab's rate limits,
+# python-gitlab itself retries 429 responses honouring Retry-After
+_MAX_CONCURRENT_REQUESTS = 8
+_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+
+# only the fields GitlabMergeRequest needs, one POST per 100 merge requests
+_OPENED_MERGE_REQUESTS_QUERY = """
+query($project: ID!, $author: String, $labels: [String!], $updatedAfter: Time, $after: String) {
+  project(fullPath: $project) {
+    mergeRequests(
+      state: opened, authorUsername: $author, labels: $labels, updatedAfter: $updatedAfter, first: 100, after: $after
+    ) {
+      pageInfo { endCursor hasNextPage }
+      nodes { iid title description state targetBranch sourceBranch }
+    }
+  }
+}
+"""
+
+_session: aiohttp.ClientSession | None = None
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """Module-wide session for the GitLab GraphQL API."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            headers={"Authorization": f"Bearer {settings.GITLAB_TOKEN}"},
+            connector=aiohttp.TCPConnector(limit=_MAX_CONCURRENT_REQUESTS, ttl_dns_cache=300, keepalive_timeout=60),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+@lru_cache(maxsize=1)
+def _project():
+    """Shared helmfile project handle, `_project.cache_clear()` drops it (e.g. after token rotation)."""
+    # lazy: the managers used here only need the project path, no need for a GET per tool call
+    return gl.projects.get(_PROJECT_ID, lazy=True)
+
+
+async def _call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking python-gitlab call in a worker thread, bounded by the module semaphore."""
+    async with _semaphore:
+        return await asyncio.to_thread(func, *args, **kwargs)
+
 
-async def list_opened_merge_requests() -> GitlabMergeRequestList:
-    """List opened merge requests for a project."""
-    project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
-    mrs = project.mergerequests.list(state="opened", all=True)
-    items = [
-        GitlabMergeRequest(
-            id=mr.id,
-            title=mr.title,
-            description=mr.description,
-            state=mr.state,
-            target_branch=mr.target_branch,
-            source_branch=mr.source_branch,
+def _invalidate_file_contents(branch: str, file_paths: Iterable[str]):
+    for file_path in file_paths:
+        _file_contents_cache.pop((branch, file_path), None)
+
+
+async def _file_exists(project, file_path: str, ref: str) -> bool:
+    try:
+        await _call(project.files.head, file_path, ref=ref)
+    except gitlab.exceptions.GitlabError as e:
+        if e.response_code == 404:
+            return False
+        raise
+    return True
+
+
+async def _graphql(query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+    async with _semaphore:
+        async with _get_session().post(_GRAPHQL_URL, json={"query": query, "variables": variables}) as resp:
+            text = await resp.text()
+            if resp.status != 200:
+                raise RuntimeError(f"Query failed: {resp.status} {text}")
+            body = orjson.loads(text)
+    if body.get("errors"):
+        raise RuntimeError(f"Query failed: {body['errors']}")
+    return body["data"]
+
+
+async def list_opened_merge_requests(
+    author_username: str | None = None, labels: str | None = None, updated_after: str | None = None
+) -> GitlabMergeRequestList:
+    """List opened merge requests for a project, optionally narrowed down by GitLab itself."""
+    variables = {
+        "project": _PROJECT_PATH,
+        "author": author_username or None,
+        "labels": [label.strip() for label in labels.split(",")] if labels else None,
+        "updatedAfter": updated_after or None,
+        "after": None,
+    }
+    items = []
+    while True:
+        merge_requests = (await _graphql(_OPENED_MERGE_REQUESTS_QUERY, variables))["project"]["mergeRequests"]
+        # GitLab's response is trusted, skip per-item validation
+        items.extend(
+            GitlabMergeRequest.model_construct(
+                id=int(mr["iid"]),
+                title=mr["title"],
+                description=mr["description"] or "",
+                state=mr["state"],
+                target_branch=mr["targetBranch"],
+                source_branch=mr["sourceBranch"],
+            )
+            for mr in merge_requests["nodes"]
         )
-        for mr in mrs
-    ]
-    return GitlabMergeRequestList(items=items)
+        if not merge_requests["pageInfo"]["hasNextPage"]:
+            return GitlabMergeRequestList(items=items)
+        variables["after"] = merge_requests["pageInfo"]["endCursor"]
 
 
 async def get_merge_request_details(mr_id: int) -> GitlabMergeRequest:
     """Get details of a merge request."""
-    project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
-    mr = project.mergerequests.get(mr_id)
+    project = _project()
+    mr = await _call(project.mergerequests.get, mr_id)
     return GitlabMergeRequest(
-        id=mr.id,
+        id=mr.iid,
         title=mr.title,
         description=mr.description,
         state=mr.state,
@@ -49,36 +177,46 @@ async def get_merge_request_details(mr_id: int) -> GitlabMergeRequest:
     )
 
 
-async def list_files_in_branch(branch: str, path: str = "") -> List[GitlabFile]:
-    """List files in repository for a given branch and path."""
-    project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
-    files = project.repository_tree(path=path, ref=branch, all=True, recursive=True)
-    result = []
-    for f in files:
-        result.append(
-            GitlabFile(
-                file_path=f.get("path", ""),
-                file_name=f.get("name", ""),
-                size=f.get("size", None),
-                encoding=None,
-                content=None,
-                ref=branch,
-                blob_id=f.get("id", None),
-                commit_id=None,
-                last_commit_id=None,
-                execute_filemode=f.get("mode", None) == "100755",
-            )
-        )
-    return result
+def _tree_entry_file(entry: Dict[str, Any], branch: str) -> GitlabFile:
+    # GitLab's response is trusted, skip per-item validation
+    return GitlabFile.model_construct(
+        file_path=entry.get("path", ""),
+        file_name=entry.get("name", ""),
+        size=entry.get("size", None),
+        encoding=None,
+        content=None,
+        ref=branch,
+        blob_id=entry.get("id", None),
+        commit_id=None,
+        last_commit_id=None,
+        execute_filemode=entry.get("mode", None) == "100755",
+    )
+
+
+async def iter_files_in_branch(branch: str, path: str = "", recursive: bool = False) -> AsyncIterator[GitlabFile]:
+    """Yield files in repository for a given branch and path one page at a time, callers can stop early."""
+    project = _project()
+    entries = await _call(
+        project.repository_tree, path=path, ref=branch, recursive=recursive, iterator=True, **_TREE_PAGINATION
+    )
+    while page := await _call(list, islice(entries, _PER_PAGE)):
+        for entry in page:
+            yield _tree_entry_file(entry, branch)
 
 
 async def update_file_and_push(branch: str, file_path: str, content: str, commit_message: str) -> GitlabCommit:
     """Update a file in a branch and push."""
-    project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
-    file = project.files.get(file_path=file_path, ref=branch)
-    file.content = content
-    file.save(branch=branch, commit_message=commit_message)
-    commit = project.commits.list(ref_name=branch, per_page=1)[0]
+    project = _project()
+    # a single-action commit returns the commit itself, no need to read the file first or list commits after
+    commit = await _call(
+        project.commits.create,
+        {
+            "branch": branch,
+            "commit_message": commit_message,
+            "actions": [{"action": "update", "file_path": file_path, "content": content}],
+        },
+    )
+    _invalidate_file_contents(branch, [file_path])
     return GitlabCommit(
         id=commit.id,
         short_id=commit.short_id,
@@ -99,17 +237,18 @@ async def create_merge_request_from_branch(
     source_branch: str, target_branch: str, title: str, description: str
 ) -> GitlabMergeRequest:
     """Create a merge request from a branch."""
-    project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
-    mr = project.mergerequests.create(
+    project = _project()
+    mr = await _call(
+        project.mergerequests.create,
         {
             "source_branch": source_branch,
             "target_branch": target_branch,
             "title": title,
             "description": description,
-        }
+        },
     )
     return GitlabMergeRequest(
-        id=mr.id,
+        id=mr.iid,
         title=mr.title,
         description=mr.description,
         target_branch=mr.target_branch,
@@ -133,19 +272,16 @@ async def create_merge_request(
             },
         )
     mr_target_branch_name = "main"
-    project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
-    existing_files = [f.file_path for f in await list_files_in_branch("main")]
-    commit_actions = []
-    for file_path, file_contents in files_updated.items():
-        commit_actions.append(
-            {
-                "action": "update" if file_path in existing_files else "create",
-                "file_path": file_path,
-                "content": file_contents,
-            }
-        )
+    project = _project()
+    # probe only the touched paths instead of listing the whole repository tree
+    exists = await asyncio.gather(*(_file_exists(project, f, mr_target_branch_name) for f in files_updated))
+    commit_actions = [
+        {"action": "update" if file_exists else "create", "file_path": file_path, "content": file_contents}
+        for (file_path, file_contents), file_exists in zip(files_updated.items(), exists)
+    ]
     try:
-        project.commits.create(
+        await _call(
+            project.commits.create,
             {
                 "commit_message": commit_message,
                 "author_email": "ai",
@@ -153,8 +289,9 @@ async def create_merge_request(
                 "actions": commit_actions,
                 "branch": merge_request_branch,
                 "start_branch": mr_target_branch_name,
-            }
+            },
         )
+        _invalidate_file_contents(merge_request_branch, files_updated)
     except Exception as e:
         raise PromptToolError(
             message=f"Problem creating commit! {e}",
@@ -166,17 +303,18 @@ async def create_merge_request(
                 "description": description,
                 "files_updated": files_updated,
             },
-        )
+        ) from e
 
     try:
-        project.mergerequests.create(
+        await _call(
+            project.mergerequests.create,
             {
                 "source_branch": merge_request_branch,
                 "target_branch": mr_target_branch_name,
                 "title": title,
                 "description": description,
                 "labels": "ai,automerge",
-            }
+            },
         )
     except Exception as e:
         raise PromptToolError(
@@ -189,22 +327,26 @@ async def create_merge_request(
                 "description": description,
                 "files_updated": files_updated,
             },
-        )
+        ) from e
 
 
 async def approve_merge_request(mr_id: int) -> bool:
     """Approve a merge request."""
-    project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
-    mr = project.mergerequests.get(mr_id)
-    mr.approve()
+    project = _project()
+    mr = await _call(project.mergerequests.get, mr_id)
+    await _call(mr.approve)
     return True
 
 
 async def get_file_contents(branch: str, file_path: str = "") -> GitlabFile:
     """Get file contents from repository, branch, and path."""
-    project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
-    file = project.files.get(file_path=file_path, ref=branch)
-    return GitlabFile(
+    now = time.monotonic()
+    cached = _file_contents_cache.get((branch, file_path))
+    if cached and now - cached[0] <= _FILE_CONTENTS_CACHE_TTL:
+        return cached[1]
+    project = _project()
+    file = await _call(project.files.get, file_path=file_path, ref=branch)
+    gl_file = GitlabFile(
         file_path=file.file_path,
         file_name=file.file_name,
         size=file.size,
@@ -216,25 +358,54 @@ async def get_file_contents(branch: str, file_path: str = "") -> GitlabFile:
         last_commit_id=getattr(file, "last_commit_id", None),
         execute_filemode=getattr(file, "execute_filemode", None),
     )
+    if len(_file_contents_cache) >= _FILE_CONTENTS_CACHE_MAX_SIZE:
+        _file_contents_cache.clear()
+    _file_contents_cache[(branch, file_path)] = (now, gl_file)
+    return gl_file
 
 
 async def list_files_in_merge_request(merge_request_id: int) -> Dict[str, str]:
-    """List files in repository for a given branch and path."""
-    mr = await get_merge_request_details(merge_request_id)
+    """Contents of the files changed by a merge request, as they are in its source branch."""
+    project = _project()
+    mr = await _call(project.mergerequests.get, merge_request_id)
+    # raw diffs aren't cut off at GitLab's diff limits, so large merge requests still list every changed file
+    changes = await _call(mr.changes, access_raw_diffs=True)
+    file_paths = [change["new_path"] for change in changes["changes"] if not change["deleted_file"]]
+    gl_files = await asyncio.gather(
+        *(get_file_contents(mr.source_branch, p) for p in file_paths), return_exceptions=True
+    )
     files = {}
-    for f in await list_files_in_branch(mr.source_branch):
-        gl_file = await get_file_contents(mr.source_branch)
-        files[f.file_path] = gl_file.content
+    for file_path, gl_file in zip(file_paths, gl_files):
+        # the source branch can move after the changes were listed, a file gone since then is skipped
+        if isinstance(gl_file, gitlab.exceptions.GitlabGetError) and gl_file.response_code == 404:
+            continue
+        if isinstance(gl_file, BaseException):
+            raise gl_file
+        files[file_path] = gl_file.content
     return files
 
 
 class GitlabMergeRequestFactory:
     def __init__(self):
-        gl = gitlab.Gitlab(settings.GITLAB_URL, private_token=settings.GITLAB_TOKEN)
-        self._project = gl.projects.get(settings.GITLAB_HELMFILE_PROJECT_PATH)
+        self._project = _project()
         self._source_branch = "main"
         self._mr_branch = None
         self._files = {}
+        self._source_tree: tuple[float, Set[str]] | None = None
+
+    def _tree_paths(self, ref: str) -> Set[str]:
+        return {
+            f["path"]
+            for f in self._project.repository_tree(ref=ref, all=True, recursive=True, **_TREE_PAGINATION)
+            if f.get("path", None)
+        }
+
+    def _source_tree_paths(self) -> Set[str]:
+        """Paths in the source branch, reused across commits made within the cache TTL."""
+        now = time.monotonic()
+        if self._source_tree is None or now - self._source_tree[0] > _SOURCE_TREE_CACHE_TTL:
+            self._source_tree = (now, self._tree_paths(self._source_branch))
+        return self._source_tree[1]
 
     async def add_file_to_merge_request(self, file_path: str, file_contents: str):
         self._files[file_path] = file_contents
@@ -242,22 +413,15 @@ class GitlabMergeRequestFactory:
     async def create_commit_in_branch(self, branch_name: str, commit_message: str):
         new_branch = True
         try:
-            self._project.branches.create({"branch": branch_name, "ref": self._source_branch})
+            await _call(self._project.branches.create, {"branch": branch_name, "ref": self._source_branch})
             logger.info(f"Branch '{branch_name}' created from '{self._source_branch}'")
         except Exception:
             new_branch = False
             logger.info(f"Branch '{branch_name}' already exists")
 
-        existing_files = []
-        for f in self._project.repository_tree(ref=self._source_branch, all=True, recursive=True):
-            path = f.get("path", None)
-            if path and path not in existing_files:
-                existing_files.append(path)
+        existing_files = await _call(self._source_tree_paths)
         if not new_branch:
-            for f in self._project.repository_tree(ref=branch_name, all=True, recursive=True):
-                path = f.get("path", None)
-                if path and path not in existing_files:
-                    existing_files.append(path)
+            existing_files = existing_files | await _call(self._tree_paths, branch_name)
 
         commit_actions = []
         for file_path, file_contents in self._files.items():
@@ -268,21 +432,24 @@ class GitlabMergeRequestFactory:
                     "content": file_contents,
                 }
             )
-        commit = self._project.commits.create(
-            {"branch": branch_name, "commit_message": commit_message, "actions": commit_actions}
+        commit = await _call(
+            self._project.commits.create,
+            {"branch": branch_name, "commit_message": commit_message, "actions": commit_actions},
         )
         logger.info(f"Commit created: {commit.id}")
+        _invalidate_file_contents(branch_name, self._files)
         self._mr_branch = branch_name
 
     async def create_merge_request(self, title: str, description: str):
-        mr = self._project.mergerequests.create(
+        mr = await _call(
+            self._project.mergerequests.create,
             {
                 "source_branch": self._mr_branch,
                 "target_branch": self._source_branch,
                 "title": title,
                 "description": description,
                 "remove_source_branch": True,
-            }
+            },
         )
 
         logger.info(f"created: {mr.web_url}")
@@ -1,34 +1,102 @@
+import asyncio
 import time
 from enum import Enum
-from typing import List
+from typing import Any, Dict, List, Tuple
 
 import aiohttp
+import orjson
+from multidict import CIMultiDict
 
 from infra_agent.models.generic import PromptToolError
 from infra_agent.models.grafana import (
+    GrafanaContainerUsage,
     GrafanaDatasource,
+    GrafanaNodeUsage,
     GrafanaNumericResult,
     GrafanaPrometheusQueryOutput,
 )
 from infra_agent.settings import settings
 
-__grafana_api_headers = {
-    "Authorization": f"Bearer {settings.GRAFANA_API_KEY}",
-    "Accept": "application/json",
-    "Content-Type": "application/json",
-}
+_session: aiohttp.ClientSession | None = None
 
+_MAX_CONCURRENT_REQUESTS = 4
+_MAX_ATTEMPTS = 3
+_RETRY_STATUSES = frozenset({429, 503})
+_semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
 
-async def __get_datasource_id() -> int | None:
-    url = f"{settings.GRAFANA_URL}api/datasources"
+_QUERY_CACHE_MAX_SIZE = 256
+_query_cache: Dict[Tuple[str, int, int, str], Tuple[float, GrafanaPrometheusQueryOutput]] = {}
+_query_inflight: Dict[Tuple[str, int, int, str], asyncio.Task] = {}
+
+_DATASOURCE_ID_TTL = 600
+_datasource_id: tuple[float, int] | None = None
+_datasource_id_lock = asyncio.Lock()
+
+
+def _get_session() -> aiohttp.ClientSession:
+    """Module-wide session, so Grafana calls share one keep-alive connection pool."""
+    global _session
+    if _session is None or _session.closed:
+        # default headers live on the session, requests don't pass (and re-normalize) them themselves
+        _session = aiohttp.ClientSession(
+            headers=CIMultiDict(
+                {
+                    "Authorization": f"Bearer {settings.GRAFANA_API_KEY}",
+                    "Accept": "application/json",
+                    "Content-Type": "application/json",
+                }
+            ),
+            connector=aiohttp.TCPConnector(
+                limit=settings.GRAFANA_MAX_CONNECTIONS, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=30
+            ),
+            timeout=aiohttp.ClientTimeout(total=settings.GRAFANA_REQUEST_TIMEOUT),
+        )
+    return _session
+
+
+async def close_session():
+    global _session
+    if _session is not None:
+        await _session.close()
+        _session = None
+
+
+def _retry_delay(resp: aiohttp.ClientResponse, attempt: int) -> float:
+    try:
+        return float(resp.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return float(2**attempt)
+
+
+async def __get_raw(url: str, params: Dict[str, Any] | None = None) -> bytes:
+    """GET a Grafana API url, with at most `_MAX_CONCURRENT_REQUESTS` in flight and backoff on throttling."""
+    for attempt in range(_MAX_ATTEMPTS):
+        async with _semaphore:
+            async with _get_session().get(url, params=params) as resp:
+                if resp.status in _RETRY_STATUSES and attempt < _MAX_ATTEMPTS - 1:
+                    delay = _retry_delay(resp, attempt)
+                else:
+                    body = await resp.read()
+                    if resp.status != 200:
+                        # keeps the status, so callers can tell throttling/outages from bad queries
+                        raise aiohttp.ClientResponseError(
+                            resp.request_info,
+                            resp.history,
+                            status=resp.status,
+                            message=f"Query failed: {body.decode(errors='replace')}",
+                        )
+                    return body
+        # sleep without holding a slot, so other requests keep going
+        await asyncio.sleep(delay)
+
+
+async def __get_json(url: str, params: Dict[str, Any] | None = None) -> Any:
+    return orjson.loads(await __get_raw(url, params))
 
-    datasources = []
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=__grafana_api_headers) as resp:
-            text = await resp.text()
-            if resp.status != 200:
-                raise RuntimeError(f"Query failed: {resp.status} {text}")
-            datasources = [GrafanaDatasource(**d) for d in await resp.json()]
+
+async def __fetch_datasource_id() -> int | None:
+    url = f"{settings.GRAFANA_URL}api/datasources"
+    datasources = [GrafanaDatasource(**d) for d in await __get_json(url)]
 
     for datasource in datasources:
         if (
@@ -39,22 +107,80 @@ async def __get_datasource_id() -> int | None:
     return None
 
 
-async def __query_prometheus_range(promql: str, from_s: int, to_s: int) -> GrafanaPrometheusQueryOutput:
+async def __get_datasource_id() -> int | None:
+    """Prometheus datasource id, resolved once and reused for `_DATASOURCE_ID_TTL` seconds."""
+    global _datasource_id
+    cached = _datasource_id
+    if cached is not None and time.monotonic() - cached[0] <= _DATASOURCE_ID_TTL:
+        return cached[1]
+    async with _datasource_id_lock:
+        # re-checked under the lock, concurrent callers wait for a single lookup
+        if _datasource_id is None or time.monotonic() - _datasource_id[0] > _DATASOURCE_ID_TTL:
+            datasource_id = await __fetch_datasource_id()
+            if datasource_id is None:
+                return None
+            _datasource_id = (time.monotonic(), datasource_id)
+        return _datasource_id[1]
+
+
+def invalidate_datasource_cache():
+    global _datasource_id
+    _datasource_id = None
+
+
+async def __fetch_prometheus_range(promql: str, from_s: int, to_s: int, step: str) -> GrafanaPrometheusQueryOutput:
     datasource_id = await __get_datasource_id()
-    step = await __get_step(from_s, to_s)
 
-    url = (
-        f"{settings.GRAFANA_URL}api/datasources/proxy/{datasource_id}/api/v1/query_range"
-        f"?query={promql}&start={from_s}&end={to_s}&step={step}"
-    )
+    url = f"{settings.GRAFANA_URL}api/datasources/proxy/{datasource_id}/api/v1/query_range"
+    params = {"query": promql, "start": from_s, "end": to_s, "step": step}
+
+    # validated straight from the body, long series skip the intermediate dict
+    return GrafanaPrometheusQueryOutput.model_validate_json(await __get_raw(url, params))
+
+
+async def __query_prometheus_instant(promql: str, at_s: int) -> GrafanaPrometheusQueryOutput:
+    """Evaluate once at `at_s`, for queries that aggregate the time window themselves."""
+    datasource_id = await __get_datasource_id()
+
+    url = f"{settings.GRAFANA_URL}api/datasources/proxy/{datasource_id}/api/v1/query"
+    params = {"query": promql, "time": at_s}
+
+    return GrafanaPrometheusQueryOutput.model_validate_json(await __get_raw(url, params))
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, headers=__grafana_api_headers) as resp:
-            text = await resp.text()
-            if resp.status != 200:
-                raise RuntimeError(f"Query failed: {resp.status} {text}")
-            d = await resp.json()
-            return GrafanaPrometheusQueryOutput.model_validate(d)
+
+async def __query_prometheus_range(promql: str, from_s: int, to_s: int) -> GrafanaPrometheusQueryOutput:
+    """Range query cached for one step, windows are aligned to the step so near-identical requests share a result."""
+    step = _get_step(from_s, to_s)
+    step_s = _STEP_SECONDS[step]
+    key = (promql, from_s - from_s % step_s, to_s - to_s % step_s, step)
+
+    now = time.monotonic()
+    cached = _query_cache.get(key)
+    if cached and now - cached[0] <= step_s:
+        return cached[1]
+
+    # single flight, the fetch runs in its own task so a cancelled caller doesn't cancel it for the others
+    inflight = _query_inflight.get(key)
+    if inflight is None:
+        inflight = asyncio.create_task(__fetch_and_cache_range(key))
+        _query_inflight[key] = inflight
+    return await asyncio.shield(inflight)
+
+
+async def __fetch_and_cache_range(key: Tuple[str, int, int, str]) -> GrafanaPrometheusQueryOutput:
+    promql, from_s, to_s, step = key
+    try:
+        result = await __fetch_prometheus_range(promql, from_s, to_s, step)
+    finally:
+        _query_inflight.pop(key, None)
+    if len(_query_cache) >= _QUERY_CACHE_MAX_SIZE:
+        _query_cache.clear()
+    _query_cache[key] = (time.monotonic(), result)
+    return result
+
+
+def clear_query_cache():
+    _query_cache.clear()
 
 
 class QueryType(Enum):
@@ -67,18 +193,37 @@ class QueryType(Enum):
         return [t.value for t in QueryType]
 
 
+# PromQL templates, label values are escaped with `_label_value` before formatting
+_OVER_TIME_TMPL = "{q_type}_over_time({metric}[{hours}h:])"
+_NODE_CPU_TMPL = '((1 - sum without (mode) (rate(node_cpu_seconds_total{{job="node-exporter", mode=~"idle|iowait|steal", instance="{node}"}}[{step}])))/ignoring(cpu) group_left count without (cpu, mode) (node_cpu_seconds_total{{job="node-exporter", mode="idle", instance="{node}"}}))'
+_NODE_MEMORY_TMPL = '(node_memory_MemTotal_bytes{{job="node-exporter", instance="{node}"}}-node_memory_MemFree_bytes{{job="node-exporter", instance="{node}"}}-node_memory_Buffers_bytes{{job="node-exporter", instance="{node}"}}-node_memory_Cached_bytes{{job="node-exporter", instance="{node}"}})'
+_CONTAINER_CPU_TMPL = (
+    'rate(container_cpu_usage_seconds_total{{namespace="{namespace}", pod="{pod}", container="{container}"}}[5m])'
+)
+_CONTAINER_MEMORY_TMPL = 'container_memory_usage_bytes{{namespace="{namespace}", pod="{pod}", container="{container}"}}'
+
+_LABEL_VALUE_ESCAPES = str.maketrans({"\\": "\\\\", '"': '\\"', "\n": "\\n"})
+
+
+def _label_value(value: str) -> str:
+    """Escape a value placed inside a double-quoted PromQL label matcher."""
+    return str(value).translate(_LABEL_VALUE_ESCAPES)
+
+
 async def _min_avg_max_over_time_query(
     q_type: QueryType, metric: str, hours: int, unit: str | None = None
 ) -> GrafanaNumericResult:
-    to_s = round(time.time())
-    from_s = round(time.time()) - hours * 60 * 60
-    promql = f"{q_type}_over_time({metric}[{hours}h:])"
-    res = await __query_prometheus_range(promql, from_s, to_s)
-    _, datapoint = res.data.result[0].values[0]
+    promql = _OVER_TIME_TMPL.format(q_type=QueryType(q_type).value, metric=metric, hours=int(hours))
+    # the *_over_time subquery already aggregates the window, a single evaluation now is enough
+    res = await __query_prometheus_instant(promql, round(time.time()))
+    datapoint = res.data.result[0].values[0]
     return GrafanaNumericResult(result=datapoint, unit=unit)
 
 
-async def __get_step(from_s: int, to_s: int) -> str:
+_STEP_SECONDS = {"1m": 60, "2m": 120, "5m": 300, "10m": 600}
+
+
+def _get_step(from_s: int, to_s: int) -> str:
     diff_s = to_s - from_s
     diff_h = float(diff_s) / 60.0 / 60.0
     if diff_h < 1:
@@ -98,11 +243,11 @@ async def get_node_cpu_usage(
         to_s = round(time.time())
     if not from_s or from_s == 0:
         from_s = to_s - 60 * 60
-    step = await __get_step(from_s, to_s)
-    promql = f'((1 - sum without (mode) (rate(node_cpu_seconds_total{{job="node-exporter", mode=~"idle|iowait|steal", instance="{node_name}"}}[{step}])))/ignoring(cpu) group_left count without (cpu, mode) (node_cpu_seconds_total{{job="node-exporter", mode="idle", instance="{node_name}"}}))'
+    step = _get_step(from_s, to_s)
+    promql = _NODE_CPU_TMPL.format(node=_label_value(node_name), step=step)
     try:
         return await __query_prometheus_range(promql, from_s, to_s)
-    except Exception:
+    except Exception as e:
         raise PromptToolError(
             message="Failed to query Prometheus for pod container CPU usage",
             tool_name="get_node_cpu_usage",
@@ -111,7 +256,7 @@ async def get_node_cpu_usage(
                 "from_s": from_s,
                 "to_s": to_s,
             },
-        )
+        ) from e
 
 
 async def get_node_memory_usage(
@@ -121,15 +266,25 @@ async def get_node_memory_usage(
         to_s = round(time.time())
     if not from_s or from_s == 0:
         from_s = to_s - 60 * 60
-    promql = f'(node_memory_MemTotal_bytes{{job="node-exporter", instance="{node_name}"}}-node_memory_MemFree_bytes{{job="node-exporter", instance="{node_name}"}}-node_memory_Buffers_bytes{{job="node-exporter", instance="{node_name}"}}-node_memory_Cached_bytes{{job="node-exporter", instance="{node_name}"}})'
+    promql = _NODE_MEMORY_TMPL.format(node=_label_value(node_name))
     try:
         return await __query_prometheus_range(promql, from_s, to_s)
-    except Exception:
+    except Exception as e:
         raise PromptToolError(
             message="Failed to query Prometheus for pod container CPU usage",
             tool_name="get_node_memory_usage",
             inputs={"node_name": node_name, "from_s": from_s, "to_s": to_s},
-        )
+        ) from e
+
+
+async def get_node_usage(node_name: str, from_s: int | None = None, to_s: int | None = None) -> GrafanaNodeUsage:
+    if not to_s:
+        to_s = round(time.time())
+    cpu, memory = await asyncio.gather(
+        get_node_cpu_usage(node_name, from_s, to_s),
+        get_node_memory_usage(node_name, from_s, to_s),
+    )
+    return GrafanaNodeUsage(cpu=cpu, memory=memory)
 
 
 # def _hours_ago_epoch(hours: float, from_dt:datetime|None = None) -> int:
@@ -172,14 +327,29 @@ async def get_node_memory_usage(
 async def get_cpu_usage_over(
     query_type: QueryType, hours: int, namespace: str, pod_name: str, container_name: str
 ) -> GrafanaNumericResult:
-    metric = f'rate(container_cpu_usage_seconds_total{{namespace="{namespace}", pod="{pod_name}", container="{container_name}"}}[5m])'
+    metric = _CONTAINER_CPU_TMPL.format(
+        namespace=_label_value(namespace), pod=_label_value(pod_name), container=_label_value(container_name)
+    )
     return await _min_avg_max_over_time_query(query_type, metric, hours, "cpu")
 
 
 async def get_memory_usage_over(
     query_type: QueryType, hours: int, namespace: str, pod_name: str, container_name: str
 ) -> GrafanaNumericResult:
-    metric = f'container_memory_usage_bytes{{namespace="{namespace}", pod="{pod_name}", container="{container_name}"}}'
+    metric = _CONTAINER_MEMORY_TMPL.format(
+        namespace=_label_value(namespace), pod=_label_value(pod_name), container=_label_value(container_name)
+    )
     ret = await _min_avg_max_over_time_query(query_type, metric, hours, "mb")
     ret.result = round(ret.result / 1024 / 1024)
     return ret
+
+
+async def get_container_usage_over(
+    query_type: QueryType, hours: int, namespace: str, pod_name: str, container_name: str
+) -> GrafanaContainerUsage:
+    # both queries run concurrently over the shared session with the cached datasource id
+    cpu, memory = await asyncio.gather(
+        get_cpu_usage_over(query_type, hours, namespace, pod_name, container_name),
+        get_memory_usage_over(query_type, hours, namespace, pod_name, container_name),
+    )
+    return GrafanaContainerUsage(cpu=cpu, memory=memory)
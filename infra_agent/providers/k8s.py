@@ -1,492 +1,562 @@
+import asyncio
 import base64
 import gzip
-import json
 import logging
+import os
+import re
+import time
 from io import StringIO
-from re import match
 from typing import Any
 
+import orjson
 from kubernetes_asyncio import client, config
 from kubernetes_asyncio.client.api_client import ApiClient
+from kubernetes_asyncio.client.exceptions import ApiException
+from kubernetes_asyncio.client.rest import RESTResponse
 from ruamel.yaml import YAML
 
 from infra_agent.models.generic import PromptToolError, SuccessPromptSummary
 from infra_agent.models.k8s import (
+    NODE_ADAPTER,
+    POD_ADAPTER,
     HelmReleaseMetadata,
     KubernetesAnyList,
-    KubernetesCapacity,
     KubernetesCapacityNodeReport,
     KubernetesPodLogs,
     Node,
     Pod,
 )
-from infra_agent.providers.gl import get_file_contents, list_files_in_branch
+from infra_agent.providers.gl import get_file_contents, iter_files_in_branch
 
 logger = logging.getLogger(__name__)
 
+HELM_RELEASE_LABEL = "app.kubernetes.io/instance"
 
-# Label prefixes to filter out from node labels
-EXCLUDED_LABEL_PREFIXES = [
+# round-trip instance, keeps key order and comments of the redacted secrets files,
+# shared since building one registers every representer/constructor again
+_YAML = YAML()
+
+_api_client: ApiClient | None = None
+_api_client_lock = asyncio.Lock()
+
+_NAMESPACE_CACHE_TTL = 30
+_NAMESPACE_CACHE_MAX_SIZE = 256
+_namespace_cache: dict[str, tuple[float, bool]] = {}
+
+
+# Label prefixes to filter out from node labels, a tuple so a single str.startswith call checks them all
+EXCLUDED_LABEL_PREFIXES = (
     "feature.node.kubernetes.io/",
     "node.kubernetes.io/",
     "beta.kubernetes.io/",
     "kubernetes.io/",
     "k8s.io/",
     "node-role.kubernetes.io/",
-]
+)
 
 
 async def _load_config():
-    try:
-        config.load_incluster_config()
-    except Exception:
-        await config.load_kube_config()
+    # the service host is injected into every pod, outside a cluster there's no point trying in-cluster config
+    if os.environ.get("KUBERNETES_SERVICE_HOST"):
+        try:
+            config.load_incluster_config()
+            return
+        except Exception as e:
+            logger.warning(f"Couldn't load in-cluster config, falling back to kubeconfig: {e}")
+    await config.load_kube_config()
+
+
+async def _get_api() -> ApiClient:
+    """Module-wide client, config is loaded once and tools share its connection pool."""
+    global _api_client
+    async with _api_client_lock:
+        if _api_client is None:
+            await _load_config()
+            _api_client = ApiClient()
+    return _api_client
+
+
+async def close_api_client():
+    global _api_client
+    if _api_client is not None:
+        await _api_client.close()
+        _api_client = None
+
+
+async def _read_json(response: Any) -> Any:
+    """Decode a raw (`_preload_content=False`) API response straight from bytes, skipping the client's
+    own deserialization into model objects and the `to_dict()` round trip."""
+    data = await response.read()
+    # raw reads skip the client's own status check, error Status bodies must not pass for empty results
+    if not 200 <= response.status <= 299:
+        raise ApiException(http_resp=RESTResponse(response, data))
+    return orjson.loads(data)
+
+
+# apiserver returns only object metadata for lists, servers without it fall back to plain json
+_PARTIAL_METADATA_LIST = "application/json;as=PartialObjectMetadataList;v=v1;g=meta.k8s.io,application/json"
+_LIST_PAGE_SIZE = 500
+
+
+async def _list_names(
+    api: ApiClient, resource_path: str, path_params: dict[str, str] | None = None, **query: str
+) -> list[str]:
+    """Names of the listed objects, fetched as metadata only since the rest of each object is discarded.
+    Pages of `_LIST_PAGE_SIZE` keep each response, and its parse on the event loop, bounded."""
+    names = []
+    continue_token = None
+    while True:
+        query_params = [*query.items(), ("limit", str(_LIST_PAGE_SIZE))]
+        if continue_token:
+            query_params.append(("continue", continue_token))
+        ret = await api.call_api(
+            resource_path,
+            "GET",
+            path_params=path_params,
+            query_params=query_params,
+            header_params={"Accept": _PARTIAL_METADATA_LIST},
+            auth_settings=["BearerToken"],
+            _return_http_data_only=True,
+            _preload_content=False,
+        )
+        data = await _read_json(ret)
+        names.extend(item["metadata"]["name"] for item in data.get("items") or ())
+        continue_token = (data.get("metadata") or {}).get("continue")
+        if not continue_token:
+            return names
 
 
-async def _filter_node_labels(labels: dict[str, str] | None) -> dict[str, str]:
-    await _load_config()
+def _filter_node_labels(labels: dict[str, str] | None) -> dict[str, str]:
     """Filter out system labels based on predefined prefixes."""
     if not labels:
         return {}
-
-    result = {}
-    for k, v in labels.items():
-        if any(k.startswith(prefix) for prefix in EXCLUDED_LABEL_PREFIXES):
-            continue
-        result[k] = v
-    return result
+    return {k: v for k, v in labels.items() if not k.startswith(EXCLUDED_LABEL_PREFIXES)}
 
 
 async def _validate_namespace(namespace: str) -> bool:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        ret = await v1.list_namespace()
-        return namespace in [item.metadata.name for item in ret.items]
+    """Check a single namespace exists, answers are reused for `_NAMESPACE_CACHE_TTL` seconds."""
+    now = time.monotonic()
+    cached = _namespace_cache.get(namespace)
+    if cached and now - cached[0] <= _NAMESPACE_CACHE_TTL:
+        return cached[1]
+
+    api = await _get_api()
+    v1 = client.CoreV1Api(api)
+    try:
+        await v1.read_namespace(name=namespace)
+        exists = True
+    except ApiException as e:
+        if e.status != 404:
+            raise
+        exists = False
 
+    if len(_namespace_cache) >= _NAMESPACE_CACHE_MAX_SIZE:
+        _namespace_cache.clear()
+    _namespace_cache[namespace] = (now, exists)
+    return exists
 
-async def __redact_enc_values(obj: Any) -> Any:
-    """Recursively walk a structure (dicts, lists, objects) and replace any
+
+def __redact_enc_values(obj: Any) -> Any:
+    """Walk a structure (dicts and lists, as loaded from YAML) and replace any
     string value starting with the prefix "ENC" with the literal "redacted".
 
     The function mutates the structure in-place and also returns it for
     convenience.
     """
-    if isinstance(obj, dict):
-        for k in list(obj.keys()):
-            v = obj[k]
-            if isinstance(v, str) and v.startswith("ENC"):
-                obj[k] = "redacted"
-            else:
-                await __redact_enc_values(v)
-        return obj
-
-    if isinstance(obj, list):
-        for i, v in enumerate(obj):
-            if isinstance(v, str) and v.startswith("ENC"):
-                obj[i] = "redacted"
-            else:
-                await __redact_enc_values(v)
-        return obj
-
     # Plain string at top-level
     if isinstance(obj, str):
         return "redacted" if obj.startswith("ENC") else obj
 
-    # Generic object with attributes (e.g., Kubernetes API objects)
-    if hasattr(obj, "__dict__"):
-        for attr, val in vars(obj).items():
-            if isinstance(val, str) and val.startswith("ENC"):
-                setattr(obj, attr, "redacted")
-            else:
-                await __redact_enc_values(val)
-        return obj
-
-    # Nothing to do for other types
+    # explicit stack, deep documents don't hit the recursion limit
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        else:
+            continue
+        for k, v in items:
+            if isinstance(v, str):
+                if v.startswith("ENC"):
+                    node[k] = "redacted"
+            elif isinstance(v, (dict, list)):
+                stack.append(v)
     return obj
 
 
+def _helm_secret_revision(secret: dict[str, Any]) -> tuple[str, int]:
+    """Sort key for raw Helm release secrets, creation time with the `version` label breaking same-second ties"""
+    metadata = secret["metadata"]
+    version = (metadata.get("labels") or {}).get("version", "")
+    return (metadata.get("creationTimestamp") or "", int(version) if version.isdigit() else 0)
+
+
+async def _list_helm_release_secrets(v1: client.CoreV1Api, namespace: str, label_selector: str) -> list[dict[str, Any]]:
+    # release payloads are large, read raw instead of deserializing every revision into V1Secret objects
+    ret = await v1.list_namespaced_secret(namespace=namespace, label_selector=label_selector, _preload_content=False)
+    return [
+        s for s in (await _read_json(ret)).get("items") or () if s["metadata"]["name"].startswith("sh.helm.release.v1.")
+    ]
+
+
 async def list_namespaces() -> KubernetesAnyList:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        ret = None
-        try:
-            ret = await v1.list_namespace()
-        except Exception:
-            raise PromptToolError(
-                message="Failed to list namespaces",
-                tool_name="list_namespaces_error",
-                inputs={},
-            )
-        return KubernetesAnyList(items=[item.metadata.name for item in ret.items])
+    api = await _get_api()
+    try:
+        names = await _list_names(api, "/api/v1/namespaces")
+    except Exception as e:
+        raise PromptToolError(
+            message="Failed to list namespaces",
+            tool_name="list_namespaces_error",
+            inputs={},
+        ) from e
+    return KubernetesAnyList(items=names)
 
 
 async def list_nodes() -> KubernetesAnyList:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        ret = None
-        try:
-            ret = await v1.list_node()
-        except Exception:
-            raise PromptToolError(
-                message="Failed to list nodes",
-                tool_name="list_nodes",
-                inputs={},
-            )
-
-        # Convert to dict and modify labels before validation
-        data = ret.to_dict()
+    api = await _get_api()
+    try:
+        names = await _list_names(api, "/api/v1/nodes")
+    except Exception as e:
+        raise PromptToolError(
+            message="Failed to list nodes",
+            tool_name="list_nodes",
+            inputs={},
+        ) from e
 
-        return KubernetesAnyList(items=[n["metadata"]["name"] for n in data["items"]])
+    return KubernetesAnyList(items=names)
 
 
 async def get_node_details(node_name: str, include_labels: bool = False, include_annotations=False) -> Node:
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        ret = None
-        try:
-            ret = await v1.read_node(node_name)
-            data = ret.to_dict()
-            node = Node.model_validate(data)
-            node.metadata.labels = (
-                await _filter_node_labels(node.metadata.labels if node.metadata.labels else {})
-                if include_labels
-                else {}
-            )
-            node.metadata.annotations = node.metadata.annotations if include_annotations else {}
-            return node
-        except Exception:
-            raise PromptToolError(
-                message="Failed to list nodes",
-                tool_name="list_nodes",
-                inputs={},
-            )
+    api = await _get_api()
+    v1 = client.CoreV1Api(api)
+    ret = None
+    try:
+        ret = await v1.read_node(node_name, _preload_content=False)
+        node = NODE_ADAPTER.validate_python(await _read_json(ret))
+        node.metadata.labels = _filter_node_labels(node.metadata.labels) if include_labels else {}
+        node.metadata.annotations = node.metadata.annotations if include_annotations else {}
+        return node
+    except Exception as e:
+        raise PromptToolError(
+            message="Failed to list nodes",
+            tool_name="list_nodes",
+            inputs={},
+        ) from e
 
 
 async def list_containers_in_pod(namespace: str, pod_name: str) -> KubernetesAnyList:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        ret = None
-        try:
-            if not await _validate_namespace(namespace):
-                raise PromptToolError(
-                    message="No such namespace",
-                    tool_name="list_containers_in_pod",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                    },
-                )
-            ret = await v1.read_namespaced_pod(name=pod_name, namespace=namespace)
-            pod = Pod.model_validate(ret.to_dict())
-            return KubernetesAnyList(items=[c.name for c in pod.spec.containers])
-        except Exception:
+    api = await _get_api()
+    v1 = client.CoreV1Api(api)
+    ret = None
+    try:
+        if not await _validate_namespace(namespace):
             raise PromptToolError(
-                message="Failed to list containers in pod",
-                tool_name="list_pod_containers",
+                message="No such namespace",
+                tool_name="list_containers_in_pod",
                 inputs={
                     "namespace": namespace,
                     "pod_name": pod_name,
                 },
             )
+        ret = await v1.read_namespaced_pod(name=pod_name, namespace=namespace, _preload_content=False)
+        # only names are returned, read from the apiserver's own JSON without building a Pod model
+        pod = await _read_json(ret)
+        return KubernetesAnyList(items=[c["name"] for c in pod["spec"]["containers"]])
+    except PromptToolError:
+        raise
+    except Exception as e:
+        raise PromptToolError(
+            message="Failed to list containers in pod",
+            tool_name="list_pod_containers",
+            inputs={
+                "namespace": namespace,
+                "pod_name": pod_name,
+            },
+        ) from e
 
 
 async def get_pod_container_logs(
     namespace: str, pod_name: str, container_name: str, tail_lines: int = 10
 ) -> KubernetesPodLogs:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        ret = None
-        try:
-            if not await _validate_namespace(namespace):
-                raise PromptToolError(
-                    message="No such namespace",
-                    tool_name="get_pod_container_logs",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                        "container_name": container_name,
-                    },
-                )
-
-            pods_in_namespaces = await list_pods_in_namespace(namespace)
-            if pod_name not in pods_in_namespaces.items:
-                raise PromptToolError(
-                    message="No such pod in namespace",
-                    tool_name="get_pod_container_logs",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                        "container_name": container_name,
-                    },
-                )
+    api = await _get_api()
+    v1 = client.CoreV1Api(api)
+    ret = None
+    try:
+        if not await _validate_namespace(namespace):
+            raise PromptToolError(
+                message="No such namespace",
+                tool_name="get_pod_container_logs",
+                inputs={
+                    "namespace": namespace,
+                    "pod_name": pod_name,
+                    "container_name": container_name,
+                },
+            )
 
+        # a missing pod is reported by the log read itself, no need to list the whole namespace first
+        try:
             ret = await v1.read_namespaced_pod_log(
                 name=pod_name,
                 namespace=namespace,
                 container=container_name,
                 tail_lines=tail_lines,
             )
-        except Exception as e:
-            logger.error(f"Error: {e}")
+        except ApiException as e:
+            if e.status != 404:
+                raise
             raise PromptToolError(
-                message=str(e),
+                message="No such pod in namespace",
                 tool_name="get_pod_container_logs",
                 inputs={
                     "namespace": namespace,
                     "pod_name": pod_name,
                     "container_name": container_name,
                 },
-            )
-        return KubernetesPodLogs(
-            container_name=container_name,
-            pod_name=pod_name,
-            namespace=namespace,
-            logs=ret.split("\n"),
-        )
+            ) from e
+    except PromptToolError:
+        raise
+    except Exception as e:
+        logger.error(f"Error: {e}")
+        raise PromptToolError(
+            message=str(e),
+            tool_name="get_pod_container_logs",
+            inputs={
+                "namespace": namespace,
+                "pod_name": pod_name,
+                "container_name": container_name,
+            },
+        ) from e
+    return KubernetesPodLogs(
+        container_name=container_name,
+        pod_name=pod_name,
+        namespace=namespace,
+        logs=ret.splitlines(),
+    )
 
 
 async def list_pods_in_namespace(namespace: str) -> KubernetesAnyList:
-    await _load_config()
-    if not await _validate_namespace(namespace):
-        raise PromptToolError(
-            message="No such namespace", tool_name="list_pods_in_namespace", inputs={"namespace": namespace}
-        )
-
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        ret = None
-        try:
-            if not await _validate_namespace(namespace):
-                raise PromptToolError(
-                    message="No such namespace", tool_name="list_pods_in_namespace", inputs={"namespace": namespace}
-                )
-            ret = await v1.list_namespaced_pod(namespace=namespace)
-        except Exception:
+    api = await _get_api()
+    try:
+        if not await _validate_namespace(namespace):
             raise PromptToolError(
-                message="Failed to list pods", tool_name="list_pods_in_namespace", inputs={"namespace": namespace}
+                message="No such namespace", tool_name="list_pods_in_namespace", inputs={"namespace": namespace}
             )
-        # data = ret.to_dict()
+        names = await _list_names(api, "/api/v1/namespaces/{namespace}/pods", {"namespace": namespace})
+    except PromptToolError:
+        raise
+    except Exception as e:
+        raise PromptToolError(
+            message="Failed to list pods", tool_name="list_pods_in_namespace", inputs={"namespace": namespace}
+        ) from e
 
-        return KubernetesAnyList(items=[pod.metadata.name for pod in ret.items])
+    return KubernetesAnyList(items=names)
 
 
 async def delete_pod(namespace: str, pod_name: str) -> SuccessPromptSummary:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        try:
-            if not await _validate_namespace(namespace):
-                raise PromptToolError(
-                    message="No such namespace",
-                    tool_name="delete_pod",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                    },
-                )
-            await v1.delete_namespaced_pod(name=pod_name, namespace=namespace)
-        except Exception:
+    api = await _get_api()
+    v1 = client.CoreV1Api(api)
+    try:
+        if not await _validate_namespace(namespace):
             raise PromptToolError(
-                message="Failed to delete pod",
+                message="No such namespace",
                 tool_name="delete_pod",
                 inputs={
                     "namespace": namespace,
                     "pod_name": pod_name,
                 },
             )
-        return SuccessPromptSummary()
+        await v1.delete_namespaced_pod(name=pod_name, namespace=namespace)
+    except PromptToolError:
+        raise
+    except Exception as e:
+        raise PromptToolError(
+            message="Failed to delete pod",
+            tool_name="delete_pod",
+            inputs={
+                "namespace": namespace,
+                "pod_name": pod_name,
+            },
+        ) from e
+    return SuccessPromptSummary()
 
 
 async def get_pod_details(namespace: str, pod_name: str) -> Pod:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        pod = None
-        try:
-            if not await _validate_namespace(namespace):
-                raise PromptToolError(
-                    message="No such namespace",
-                    tool_name="get_pod_details",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                    },
-                )
-            pod = await v1.read_namespaced_pod(name=pod_name, namespace=namespace)
-            return Pod.model_validate(pod.to_dict())
-        except Exception:
+    api = await _get_api()
+    v1 = client.CoreV1Api(api)
+    pod = None
+    try:
+        if not await _validate_namespace(namespace):
             raise PromptToolError(
-                message="No such pod",
+                message="No such namespace",
                 tool_name="get_pod_details",
                 inputs={
                     "namespace": namespace,
                     "pod_name": pod_name,
                 },
             )
+        pod = await v1.read_namespaced_pod(name=pod_name, namespace=namespace, _preload_content=False)
+        return POD_ADAPTER.validate_python(await _read_json(pod))
+    except PromptToolError:
+        raise
+    except Exception as e:
+        raise PromptToolError(
+            message="No such pod",
+            tool_name="get_pod_details",
+            inputs={
+                "namespace": namespace,
+                "pod_name": pod_name,
+            },
+        ) from e
 
 
 async def list_pods_in_node(node_name: str) -> KubernetesAnyList:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        pods = None
-        try:
-            pods = await v1.list_pod_for_all_namespaces(field_selector=f"spec.nodeName={node_name}")
-        except Exception:
-            raise PromptToolError(
-                message="Failed to list node pods", tool_name="list_pods_in_node", inputs={"node_name": node_name}
-            )
-        return KubernetesAnyList(items=[pod.metadata.name for pod in pods.items])
+    api = await _get_api()
+    try:
+        names = await _list_names(api, "/api/v1/pods", fieldSelector=f"spec.nodeName={node_name}")
+    except Exception as e:
+        raise PromptToolError(
+            message="Failed to list node pods", tool_name="list_pods_in_node", inputs={"node_name": node_name}
+        ) from e
+    return KubernetesAnyList(items=names)
 
 
 async def get_node_resources(node_name: str) -> KubernetesCapacityNodeReport:
-    await _load_config()
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
-        node = None
-        try:
-            node = await v1.read_node(name=node_name)
-            # metrics_api = client.CustomObjectsApi(api)
-            # node_metrics = await metrics_api.get_cluster_custom_object("metrics.k8s.io", "v1beta1", "nodes", node_name)
-
-            capacity = node.status.capacity
-            allocatable = node.status.allocatable
-            return KubernetesCapacityNodeReport(
-                name=node_name,
-                capacity=KubernetesCapacity(
-                    cpu=int(capacity.get("cpu")) if capacity.get("cpu", None) else None,
-                    memory=capacity.get("memory", "unavailable"),
-                    pods=int(capacity.get("pods")) if capacity.get("pods", None) else None,
-                    ephemeral_storage=capacity.get("ephemeral-storage", "unavailable"),
-                ),
-                allocatable=KubernetesCapacity(
-                    cpu=int(allocatable.get("cpu")) if allocatable.get("cpu", None) else None,
-                    memory=capacity.get("memory", "unavailable"),
-                    pods=int(allocatable.get("pods")) if allocatable.get("pods", None) else None,
-                    ephemeral_storage=capacity.get("ephemeral-storage", "unavailable"),
-                ),
-            )
-        except Exception as e:
-            raise PromptToolError(
-                message=f"Failed to get node resources: {e}",
-                tool_name="get_node_resources",
-                inputs={"node_name": node_name},
-            )
+    api = await _get_api()
+    v1 = client.CoreV1Api(api)
+    node = None
+    try:
+        ret = await v1.read_node(name=node_name, _preload_content=False)
+        node = NODE_ADAPTER.validate_python(await _read_json(ret))
+        # metrics_api = client.CustomObjectsApi(api)
+        # node_metrics = await metrics_api.get_cluster_custom_object("metrics.k8s.io", "v1beta1", "nodes", node_name)
+
+        # quantities are parsed by NodeStatus validation
+        status = node.status
+        return KubernetesCapacityNodeReport(
+            name=node_name,
+            capacity=status.capacity if status else None,
+            allocatable=status.allocatable if status else None,
+        )
+    except Exception as e:
+        raise PromptToolError(
+            message=f"Failed to get node resources: {e}",
+            tool_name="get_node_resources",
+            inputs={"node_name": node_name},
+        ) from e
 
 
 async def get_helm_release_definition(namespace: str, pod_name: str) -> HelmReleaseMetadata:
-    await _load_config()
     """
     Use only Kubernetes API to load the latest Helm release metadata for a given namespace and pod.
     Returns decoded metadata dict or error. Now also returns values.yaml if possible.
     """
-    async with ApiClient() as api:
-        v1 = client.CoreV1Api(api)
+    api = await _get_api()
+    v1 = client.CoreV1Api(api)
+    try:
+        if not await _validate_namespace(namespace):
+            raise PromptToolError(
+                message="No such namespace",
+                tool_name="get_latest_helm_release_metadata",
+                inputs={
+                    "namespace": namespace,
+                    "pod_name": pod_name,
+                },
+            )
+        # Helm labels its release secrets, narrowed to the pod's own release when the pod carries the label
+        label_selector = "owner=helm"
         try:
-            if not await _validate_namespace(namespace):
-                raise PromptToolError(
-                    message="No such namespace",
-                    tool_name="get_latest_helm_release_metadata",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                    },
-                )
-            secrets = await v1.list_namespaced_secret(namespace=namespace)
-            helm_secrets = [s for s in secrets.items if s.metadata.name.startswith("sh.helm.release.v1.")]
-            if not helm_secrets:
-                raise PromptToolError(
-                    message="Can't find Helm release for given container",
-                    tool_name="get_latest_helm_release_metadata",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                    },
-                )
-            # Find the latest secret by creationTimestamp
-            latest_secret = max(helm_secrets, key=lambda s: s.metadata.creation_timestamp or "")
-            # The release data is in the 'data' field, key 'release'
-            release_double_b64 = latest_secret.data.get("release") if latest_secret.data else None
-            if not release_double_b64:
-                raise PromptToolError(
-                    message="No release data found in latest Helm secret",
-                    tool_name="get_latest_helm_release_metadata",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                    },
-                )
-            release_b64 = base64.b64decode(release_double_b64)
-            release_bytes = base64.b64decode(release_b64)
-            # Helm stores a gzipped protobuf
+            ret = await v1.read_namespaced_pod(name=pod_name, namespace=namespace, _preload_content=False)
+            pod_labels = (await _read_json(ret))["metadata"].get("labels") or {}
+            if release_name := pod_labels.get(HELM_RELEASE_LABEL):
+                label_selector = f"owner=helm,name={release_name}"
+        except Exception as e:
+            logger.debug(f"Couldn't resolve Helm release of pod {namespace}/{pod_name}: {e}")
+        helm_secrets = await _list_helm_release_secrets(v1, namespace, label_selector)
+        if not helm_secrets and label_selector != "owner=helm":
+            # charts don't always set the instance label to the release name, fall back to every release
+            helm_secrets = await _list_helm_release_secrets(v1, namespace, "owner=helm")
+        if not helm_secrets:
+            raise PromptToolError(
+                message="Can't find Helm release for given container",
+                tool_name="get_latest_helm_release_metadata",
+                inputs={
+                    "namespace": namespace,
+                    "pod_name": pod_name,
+                },
+            )
+        # Find the latest secret by creationTimestamp
+        latest_secret = max(helm_secrets, key=_helm_secret_revision)
+        # The release data is in the 'data' field, key 'release'
+        release_double_b64 = (latest_secret.get("data") or {}).get("release")
+        if not release_double_b64:
+            raise PromptToolError(
+                message="No release data found in latest Helm secret",
+                tool_name="get_latest_helm_release_metadata",
+                inputs={
+                    "namespace": namespace,
+                    "pod_name": pod_name,
+                },
+            )
+        release_b64 = base64.b64decode(release_double_b64)
+        release_bytes = base64.b64decode(release_b64)
+        # Helm 3 stores the release as gzipped JSON, parsed in one pass straight from the decompressed bytes
+        try:
+            metadata = orjson.loads(gzip.decompress(release_bytes))
+        except Exception as e:
+            raise PromptToolError(
+                message="Couldn't parse Helm release metadata",
+                tool_name="get_latest_helm_release_metadata",
+                inputs={
+                    "namespace": namespace,
+                    "pod_name": pod_name,
+                },
+            ) from e
+
+        if isinstance(metadata, dict) and "chart" in metadata:
             try:
-                decompressed = gzip.decompress(release_bytes)
-            except Exception:
-                raise PromptToolError(
-                    message="Couldn't parse Helm release metadata",
-                    tool_name="get_latest_helm_release_metadata",
-                    inputs={
-                        "namespace": namespace,
-                        "pod_name": pod_name,
-                    },
-                )
+                buf = StringIO()
+                _YAML.dump(metadata["chart"]["values"], buf)
+                default_values_yaml = buf.getvalue()
 
-            release_str = decompressed.decode("utf-8", errors="ignore")
-            if "chart" in release_str:
-                start = release_str.find("{")
-                end = release_str.rfind("}") + 1
-                metadata_json = release_str[start:end]
-                try:
-                    metadata = json.loads(metadata_json)
-                    buf = StringIO()
-                    default_values_yaml = YAML().dump(metadata["chart"]["values"], buf)
-
-                    release_definition_file_paths = [
-                        f"helmfiles/[a-z0-9_-]+/values/{metadata['name']}/[a-z0-9_-]+.yaml",
-                        f"helmfiles/[a-z0-9_-]+/values/{metadata['name']}/[a-z0-9_-]+.secrets.yaml",
-                    ]
-                    values_yaml = {}
-                    data = await list_files_in_branch("main")
-                    for file_path in [
-                        f.file_path for f in data if any([match(m, f.file_path) for m in release_definition_file_paths])
-                    ]:
-                        _f = await get_file_contents("main", file_path)
-                        _f_content = _f.content
-                        _f_yaml = YAML().load(_f_content)
-                        if file_path.endswith(".secrets.yaml"):
-                            del _f_yaml["sops"]
-                            _f_yaml = await __redact_enc_values(_f_yaml)
-                            _f_content = "# NOTE FOR AI:\n"
-                            _f_content += "#   file was redacted from any secrets\n"
-                            _f_content += "#   always treat `redacted` string as valid\n"
-                            _f_content += "#   never edit this file\n\n"
-                            buf = StringIO()
-                            YAML().dump(_f_yaml, buf)
-                            _f_content += buf.getvalue()
-                        values_yaml[file_path] = _f_content
-
-                    return HelmReleaseMetadata(
-                        name=metadata["name"],
-                        namespace=namespace,
-                        chart_name=metadata["chart"]["metadata"]["name"],
-                        default_values=default_values_yaml,
-                        values=values_yaml,
-                    )
-                except Exception:
-                    raise PromptToolError(
-                        message="Couldn't parse Helm release metadata",
-                        tool_name="get_latest_helm_release_metadata",
-                        inputs={
-                            "namespace": namespace,
-                            "pod_name": pod_name,
-                        },
-                    )
-            else:
+                # values and secrets files of this release, compiled once per call instead of per file
+                release_definition_file_path = re.compile(
+                    rf"helmfiles/[a-z0-9_-]+/values/{re.escape(metadata['name'])}/[a-z0-9_-]+(?:\.secrets)?\.yaml"
+                )
+                values_yaml = {}
+                matching_file_paths = [
+                    f.file_path
+                    async for f in iter_files_in_branch("main", path="helmfiles", recursive=True)
+                    if release_definition_file_path.fullmatch(f.file_path)
+                ]
+                # fetched concurrently, GitLab calls are already capped by the provider's semaphore
+                matching_files = await asyncio.gather(*(get_file_contents("main", p) for p in matching_file_paths))
+                for file_path, _f in zip(matching_file_paths, matching_files):
+                    _f_content = _f.content
+                    if file_path.endswith(".secrets.yaml"):
+                        _f_yaml = _YAML.load(_f_content)
+                        del _f_yaml["sops"]
+                        # one substring scan of the raw file, the tree is only walked when it can hold ENC values
+                        if "ENC" in _f_content:
+                            _f_yaml = __redact_enc_values(_f_yaml)
+                        _f_content = "# NOTE FOR AI:\n"
+                        _f_content += "#   file was redacted from any secrets\n"
+                        _f_content += "#   always treat `redacted` string as valid\n"
+                        _f_content += "#   never edit this file\n\n"
+                        buf = StringIO()
+                        _YAML.dump(_f_yaml, buf)
+                        _f_content += buf.getvalue()
+                    values_yaml[file_path] = _f_content
+
+                return HelmReleaseMetadata(
+                    name=metadata["name"],
+                    namespace=namespace,
+                    chart_name=metadata["chart"]["metadata"]["name"],
+                    default_values=default_values_yaml,
+                    values=values_yaml,
+                )
+            except Exception as e:
                 raise PromptToolError(
                     message="Couldn't parse Helm release metadata",
                     tool_name="get_latest_helm_release_metadata",
@@ -494,13 +564,24 @@ async def get_helm_release_definition(namespace: str, pod_name: str) -> HelmRele
                         "namespace": namespace,
                         "pod_name": pod_name,
                     },
-                )
-        except Exception:
+                ) from e
+        else:
             raise PromptToolError(
-                message="Failed to decode pod's helm release metadata",
+                message="Couldn't parse Helm release metadata",
                 tool_name="get_latest_helm_release_metadata",
                 inputs={
                     "namespace": namespace,
                     "pod_name": pod_name,
                 },
             )
+    except PromptToolError:
+        raise
+    except Exception as e:
+        raise PromptToolError(
+            message="Failed to decode pod's helm release metadata",
+            tool_name="get_latest_helm_release_metadata",
+            inputs={
+                "namespace": namespace,
+                "pod_name": pod_name,
+            },
+        ) from e
@@ -16,10 +16,12 @@ from infra_agent.providers.gl import (
 )
 from infra_agent.providers.grafana import (
     QueryType,
+    get_container_usage_over,
     get_cpu_usage_over,
     get_memory_usage_over,
     get_node_cpu_usage,
     get_node_memory_usage,
+    get_node_usage,
 )
 from infra_agent.providers.k8s import (
     get_helm_release_definition,
@@ -136,7 +138,7 @@ tools = [
     OpenAITool(
         function=OpenAIFunction(
             name="get_node_details",
-            description="Get details about node in Kubernetes",
+            description="Get details about node in Kubernetes - capacity/allocatable list cpu in cores, memory and ephemeral_storage in bytes; other resources (e.g. nvidia.com/gpu, hugepages-*) keep their Kubernetes quantity strings",
             parameters=OpenAIToolParameter(
                 properties={
                     "node_name": OpenAIToolParameterProperty(description="Node name"),
@@ -180,7 +182,7 @@ tools = [
     OpenAITool(
         function=OpenAIFunction(
             name="get_node_resources",
-            description="Get Kubernetes node resource capacity and possible allocatablity",
+            description="Get Kubernetes node resource capacity and possible allocatablity - capacity/allocatable list cpu in cores, memory and ephemeral_storage in bytes; other resources (e.g. nvidia.com/gpu, hugepages-*) keep their Kubernetes quantity strings",
             parameters=OpenAIToolParameter(
                 properties={"node_name": OpenAIToolParameterProperty(description="Node name")},
                 required=["node_name"],
@@ -236,10 +238,27 @@ tools = [
         ),
         handler=get_memory_usage_over,
     ),
+    OpenAITool(
+        function=OpenAIFunction(
+            name="get_container_usage_over",
+            description="Allows to get min/avg/max container CPU (in CPUs) and memory (in MBs) usage at once over given time in hours from now",
+            parameters=OpenAIToolParameter(
+                properties={
+                    "query_type": OpenAIToolParameterProperty(description="Aggregation type", enum=QueryType.values()),
+                    "hours": OpenAIToolParameterProperty(description="Time window in hours", type="integer"),
+                    "namespace": OpenAIToolParameterProperty(description="Pod namespace"),
+                    "pod_name": OpenAIToolParameterProperty(description="Pod name"),
+                    "container_name": OpenAIToolParameterProperty(description="Pod's container name"),
+                },
+                required=["query_type", "hours", "namespace", "pod_name", "container_name"],
+            ),
+        ),
+        handler=get_container_usage_over,
+    ),
     OpenAITool(
         function=OpenAIFunction(
             name="get_node_cpu_usage_from_grafana",
-            description="Get node cpu usage from Prometheus- returns dict(timestamp, datapoint)",
+            description="Get node cpu usage over the last hour from Prometheus - returns `data.result`, a list of series each with `metric` labels and column-wise `timestamps` (epoch seconds) and `values` lists, where `values[i]` was sampled at `timestamps[i]`",
             parameters=OpenAIToolParameter(
                 properties={
                     "node_name": OpenAIToolParameterProperty(description="Node name"),
@@ -263,7 +282,7 @@ tools = [
     OpenAITool(
         function=OpenAIFunction(
             name="get_node_memory_usage_from_grafana",
-            description="Get node memory usage from Prometheus- returns dict(timestamp, datapoint)",
+            description="Get node memory usage over the last hour from Prometheus - returns `data.result`, a list of series each with `metric` labels and column-wise `timestamps` (epoch seconds) and `values` lists, where `values[i]` was sampled at `timestamps[i]`",
             parameters=OpenAIToolParameter(
                 properties={
                     "node_name": OpenAIToolParameterProperty(description="Node name"),
@@ -283,6 +302,19 @@ tools = [
         ),
         handler=get_node_memory_usage,
     ),
+    OpenAITool(
+        function=OpenAIFunction(
+            name="get_node_usage_from_grafana",
+            description="Get node cpu and memory usage over the last hour from Prometheus at once - returns `cpu` and `memory`, each with `data.result`, a list of series each with `metric` labels and column-wise `timestamps` (epoch seconds) and `values` lists, where `values[i]` was sampled at `timestamps[i]`",
+            parameters=OpenAIToolParameter(
+                properties={
+                    "node_name": OpenAIToolParameterProperty(description="Node name"),
+                },
+                required=["node_name"],
+            ),
+        ),
+        handler=get_node_usage,
+    ),
     # OpenAITool(
     #     function=OpenAIFunction(
     #         name="list_alerts_in_grafana",
@@ -313,12 +345,28 @@ tools = [
     #     handler=create_merge_request,
     # ),
     OpenAITool(
-        function=OpenAIFunction(description="Lists all opened merge requests", name="list_opened_merge_requests"),
+        function=OpenAIFunction(
+            description="Lists all opened merge requests",
+            name="list_opened_merge_requests",
+            parameters=OpenAIToolParameter(
+                properties={
+                    "author_username": OpenAIToolParameterProperty(
+                        description="Only merge requests opened by this GitLab username"
+                    ),
+                    "labels": OpenAIToolParameterProperty(
+                        description="Comma separated labels, only merge requests having all of them are listed"
+                    ),
+                    "updated_after": OpenAIToolParameterProperty(
+                        description="ISO 8601 datetime, only merge requests updated after it are listed"
+                    ),
+                },
+            ),
+        ),
         handler=list_opened_merge_requests,
     ),
     OpenAITool(
         function=OpenAIFunction(
-            description="Lists all opened merge requests",
+            description="Returns the files changed by a merge request, mapped from file path to its contents in the merge request's source branch",
             name="list_files_in_merge_request",
             parameters=OpenAIToolParameter(
                 properties={
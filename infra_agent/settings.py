@@ -45,6 +45,12 @@ class Settings(BaseSettings):
     OPENAI_API_URL: Union[str, URL] | None = None
     OPENAI_API_RATE_LIMIT_REQUESTS: int = 0
     OPENAI_API_RATE_LIMIT_TIMEWINDOW: int = 0
+    OPENAI_API_MAX_CONCURRENT_REQUESTS: int = 4
+    OPENAI_PROMPT_CACHE: bool = False
+    AGENT_MAX_CONCURRENT_RUNS: int = 4
+    OPENAI_QUERY_CACHE_TTL: int = 300
+    OPENAI_QUERY_CACHE_MAX_SIZE: int = 512
+    BLOCKING_CALLS_MAX_WORKERS: int = 16
     GITLAB_URL: Union[str, URL] = "https://gitlab.com"
     GITLAB_TOKEN: str = ""
     GITLAB_HELMFILE_PROJECT_PATH: str = "test/helmfile"
@@ -52,6 +58,8 @@ class Settings(BaseSettings):
     GRAFANA_API_KEY: str = ""
     GRAFANA_ORG_ID: int = 1
     GRAFANA_PROMETHEUS_DATASOURCE_NAME: str = "prometheus"
+    GRAFANA_REQUEST_TIMEOUT: float = 30.0
+    GRAFANA_MAX_CONNECTIONS: int = 100
     GRAFANA_WEBHOOK_SYSTEM_PROMPT_FORMAT: str = """
 You are an autonomous Kubernetes configuration and remediation agent. Your job: investigate Grafana alerts about pods, determine root cause, and make minimal, relevant configuration edits (in-repo) to fix the problem. You have diagnostic and remediation tools available. Use them carefully.
 
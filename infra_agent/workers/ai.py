@@ -1,9 +1,13 @@
-import json
+import asyncio
+import hashlib
 import logging
+import time
+from collections import OrderedDict, deque
 from typing import Any, List
 
+import orjson
 from openai import AsyncOpenAI, BadRequestError, RateLimitError
-from ratelimit import limits, sleep_and_retry
+from pydantic import BaseModel
 
 from infra_agent.models.ai import (
     OpenAICaseSummary,
@@ -18,33 +22,61 @@ from infra_agent.settings import settings
 
 logger = logging.getLogger(__name__)
 
+_UNSUMMARIZED_ROLES = frozenset({"function", "tool", "developer"})
+_TOOL_ROLES = frozenset({"tool"})
+
+# the tool catalog is static, render it for the API once
+_tools_schema = [tool.as_dict() for tool in tools]
+
+_query_cache: OrderedDict[str, tuple[float, asyncio.Future]] = OrderedDict()
+_query_cache_lock = asyncio.Lock()
+
+_openai_semaphore = asyncio.Semaphore(settings.OPENAI_API_MAX_CONCURRENT_REQUESTS)
+_openai_request_times: deque[float] = deque()
+_openai_rate_limit_lock = asyncio.Lock()
+
 
 async def _load_config() -> AsyncOpenAI:
     return AsyncOpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_API_URL)
 
 
-@sleep_and_retry
-@limits(calls=settings.OPENAI_API_RATE_LIMIT_REQUESTS, period=settings.OPENAI_API_RATE_LIMIT_TIMEWINDOW)
-def __avoid_ratelimits():
-    pass
+async def __avoid_ratelimits():
+    """Wait until another request fits into the configured sliding rate-limit window."""
+    calls = settings.OPENAI_API_RATE_LIMIT_REQUESTS
+    period = settings.OPENAI_API_RATE_LIMIT_TIMEWINDOW
+    if calls <= 0 or period <= 0:
+        return
+    async with _openai_rate_limit_lock:
+        while True:
+            now = time.monotonic()
+            while _openai_request_times and now - _openai_request_times[0] >= period:
+                _openai_request_times.popleft()
+            if len(_openai_request_times) < calls:
+                _openai_request_times.append(now)
+                return
+            await asyncio.sleep(period - (now - _openai_request_times[0]))
 
 
 async def __gpt_query(
     messages: List[OpenAIMessage],
     model: str = "gemini-2.5-flash",
-    tools: List[OpenAITool] = [],
+    tools_schema: List[dict[str, Any]] = [],
+    prompt_cache_key: str | None = None,
 ) -> OpenAIMessage | None:
     client = await _load_config()
     completions_create_kwargs = {
         "model": model,
         "messages": [message.model_dump(exclude_none=True) for message in messages],
     }
-    completions_create_kwargs["tools"] = [tool.model_dump(exclude_none=True) for tool in tools]
+    completions_create_kwargs["tools"] = tools_schema
     completions_create_kwargs["tool_choice"] = "auto"
+    if prompt_cache_key:
+        completions_create_kwargs["prompt_cache_key"] = prompt_cache_key
     raw_ai_message = None
     try:
-        __avoid_ratelimits()
-        response = await client.chat.completions.create(**completions_create_kwargs)
+        async with _openai_semaphore:
+            await __avoid_ratelimits()
+            response = await client.chat.completions.create(**completions_create_kwargs)
         raw_ai_message = response.choices[0].message.to_dict()
     except RateLimitError as exc:
         logger.error(exc)
@@ -53,7 +85,7 @@ async def __gpt_query(
     return OpenAIMessage(**raw_ai_message) if raw_ai_message else None
 
 
-async def __call2log(fname: str, kwargs: dict[str, Any]):
+def __call2log(fname: str, kwargs: dict[str, Any]):
     pretty_function_args = []
     for k, v in kwargs.items():
         _arg = k
@@ -69,9 +101,17 @@ async def __call2log(fname: str, kwargs: dict[str, Any]):
     return f"{fname}({','.join(pretty_function_args)})"
 
 
+def _dump_tool_result(tool_result: Any) -> str:
+    if not tool_result:
+        return "{}"
+    if isinstance(tool_result, BaseModel):
+        return tool_result.model_dump_json(exclude_none=True)
+    return orjson.dumps(tool_result, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
 async def _run_tool(tool: OpenAITool, args: dict) -> Any:
     if tool.handler:
-        logger.info(await __call2log(tool.function.name, args))
+        logger.info(__call2log(tool.function.name, args))
         tool_result = await tool.handler(**args)
         logger.debug(f"tool {tool.function.name} returned: {tool_result}")
         return tool_result
@@ -84,7 +124,7 @@ async def _handle_tool_calls(
     messages: List[OpenAIMessage], tool_calls: List[OpenAIToolCall] | None = None
 ) -> List[OpenAIMessage] | None:
     for tool_call in tool_calls or []:
-        parsed_args = json.loads(tool_call.function.arguments)
+        parsed_args = orjson.loads(tool_call.function.arguments)
 
         tool_found = False
         for tool in tools:
@@ -122,9 +162,7 @@ it's result was:
                                         tool_parameters="\n".join(
                                             [f"  - '{k}' = '{v}'" for k, v in parsed_args.items()]
                                         ),
-                                        tool_result=json.dumps(
-                                            tool_result.model_dump(exclude_none=True) if tool_result else {}
-                                        ),
+                                        tool_result=_dump_tool_result(tool_result),
                                     ),
                                     tool_call_id=tool_call.id,
                                     tool_call_arguments=tool_call.function.arguments,
@@ -136,14 +174,14 @@ it's result was:
                             OpenAIMessage(
                                 role="tool",
                                 name=tool_call.function.name,
-                                content=exc.model().error,
+                                content=(
+                                    f"{exc} (temporary failure, the call can be retried)" if exc.retryable else str(exc)
+                                ),
                                 tool_call_id=tool_call.id,
                             )
                         )
                     except Exception as exc:
-                        logger.error(
-                            f"Error running a tool {await __call2log(tool_call.function.name, parsed_args)} - {exc}"
-                        )
+                        logger.error(f"Error running a tool {__call2log(tool_call.function.name, parsed_args)} - {exc}")
                         messages.append(
                             OpenAIMessage(
                                 role="tool",
@@ -176,13 +214,22 @@ it's result was:
     return messages
 
 
+def _prompt_cache_key(messages: List[OpenAIMessage]) -> str:
+    static_prefix = [messages[0].content or ""] if messages and messages[0].role == "developer" else []
+    static_prefix.extend(tool.function.name for tool in tools)
+    return hashlib.blake2b("\n".join(static_prefix).encode("utf-8"), digest_size=16).hexdigest()
+
+
 async def gpt_query(
     prompt: str,
     system_prompt: str | None = None,
     messages: List[OpenAIMessage] = [],
     model: str = "gemini-2.5-flash",
+    cache_prompt: bool = False,
     **kwargs: Any,
 ) -> OpenAIPromptSummary:
+    # static content (system prompt, tool definitions) always precedes the dynamic user prompt,
+    # so providers with prefix caching can reuse it across calls
     if not messages and system_prompt:
         system_prompt_kwargs = kwargs
         system_prompt_kwargs["finish_function_name"] = closer.function.name
@@ -192,16 +239,13 @@ async def gpt_query(
     _prompt = prompt.format(**kwargs)
     logger.debug(f"Prompt: {_prompt}")
     messages.append(OpenAIMessage(role="user", content=_prompt))
-    response_message = await __gpt_query(messages, model, tools)
+    prompt_cache_key = _prompt_cache_key(messages) if cache_prompt else None
+    response_message = await __gpt_query(messages, model, _tools_schema, prompt_cache_key)
     if response_message and response_message.content:
         logger.info(f"assistant: '{response_message.content}'")
     if not response_message:
         return OpenAIPromptSummary(
-            messages=[
-                message
-                for message in messages
-                if message.role not in ["function", "tool", "developer"] and message.content
-            ][1:],
+            messages=[m for m in messages if m.role not in _UNSUMMARIZED_ROLES and m.content][1:],
             resolved=False,
         )
 
@@ -223,11 +267,11 @@ async def gpt_query(
                 )
                 return OpenAIPromptSummary(
                     data=case_summary,
-                    messages=[m for m in messages[2:] if m.role not in ["tool"] and m.content],
+                    messages=[m for m in messages[2:] if m.role not in _TOOL_ROLES and m.content],
                     resolved=case_summary.solved if case_summary else False,
                 )
         # if messages[-1]
-        response_message = await __gpt_query(messages, model, tools)
+        response_message = await __gpt_query(messages, model, _tools_schema, prompt_cache_key)
         if response_message and response_message.content:
             logger.info(f"assistant: '{response_message.content}'")
         if not response_message:
@@ -237,12 +281,12 @@ async def gpt_query(
         if not tool_calls:
             logger.warning("AI didn't respond with any tool_requests!")
             try:
-                summary = OpenAICaseSummary.model_validate(json.loads(response_message.content or "")["arguments"])
+                summary = OpenAICaseSummary.model_validate(orjson.loads(response_message.content or "")["arguments"])
                 case_solved = summary.solved
                 logger.info("closer tool called, finishing reasoning")
                 messages.append(OpenAIMessage(role="assistant", content=response_message.content))
                 break
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
             messages.append(
                 OpenAIMessage(
@@ -250,7 +294,7 @@ async def gpt_query(
                     content=f"Use provided tools to solve the task, do not ask for permissions, just do things! If all other options are exhausted, run `{closer.function.name}` and provide appropriate parameters!",
                 )
             )
-            response_message = await __gpt_query(messages, model, tools)
+            response_message = await __gpt_query(messages, model, _tools_schema, prompt_cache_key)
             if response_message and response_message.content:
                 logger.info(f"assistant: '{response_message.content}'")
             if not response_message:
@@ -265,3 +309,52 @@ async def gpt_query(
         messages=[],  # [m for m in messages[2:] if m.role not in ["tool"] and m.content],
         resolved=case_solved,
     )
+
+
+def _query_cache_key(prompt: str, system_prompt: str | None, model: str, kwargs: dict[str, Any]) -> str:
+    payload = orjson.dumps([prompt, system_prompt, model, kwargs], option=orjson.OPT_SORT_KEYS)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+async def cached_gpt_query(
+    prompt: str,
+    system_prompt: str | None = None,
+    model: str = "gemini-2.5-flash",
+    **kwargs: Any,
+) -> OpenAIPromptSummary:
+    """Run `gpt_query` for a fresh conversation, reusing resolved results for identical prompts within the TTL.
+
+    Concurrent identical queries share a single in-flight call.
+    """
+    if settings.OPENAI_QUERY_CACHE_TTL <= 0:
+        return await gpt_query(prompt, system_prompt, [], model=model, **kwargs)
+
+    key = _query_cache_key(prompt, system_prompt, model, kwargs)
+    async with _query_cache_lock:
+        now = time.monotonic()
+        cached = _query_cache.get(key)
+        if cached and cached[0] > now:
+            logger.info("reusing cached result for identical query")
+            _query_cache.move_to_end(key)
+            future = cached[1]
+        else:
+            future = asyncio.ensure_future(gpt_query(prompt, system_prompt, [], model=model, **kwargs))
+            _query_cache[key] = (now + settings.OPENAI_QUERY_CACHE_TTL, future)
+            while len(_query_cache) > settings.OPENAI_QUERY_CACHE_MAX_SIZE:
+                _query_cache.popitem(last=False)
+    try:
+        result = await asyncio.shield(future)
+    except Exception:
+        await _evict_cached_query(key, future)
+        raise
+    if not result.resolved:
+        # unresolved runs include API errors swallowed by `gpt_query` (rate limits, bad requests),
+        # only the in-flight call is shared so the next identical alert gets a fresh attempt
+        await _evict_cached_query(key, future)
+    return result
+
+
+async def _evict_cached_query(key: str, future: asyncio.Future):
+    async with _query_cache_lock:
+        if key in _query_cache and _query_cache[key][1] is future:
+            del _query_cache[key]
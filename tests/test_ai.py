@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from infra_agent.models.ai import OpenAIPromptSummary
+from infra_agent.workers import ai
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Replaces the agent run, resolved unless the prompt asks otherwise, records every run"""
+    calls = []
+
+    async def gpt_query(prompt, system_prompt=None, messages=[], model="", **kwargs):
+        calls.append(prompt)
+        await asyncio.sleep(0.01)
+        return OpenAIPromptSummary(messages=[], resolved=prompt != "rate limited")
+
+    monkeypatch.setattr(ai, "gpt_query", gpt_query)
+    ai._query_cache.clear()
+    yield calls
+    ai._query_cache.clear()
+
+
+def test_cached_gpt_query(queries):
+    async def run():
+        first = await asyncio.gather(ai.cached_gpt_query("alert"), ai.cached_gpt_query("alert"))
+        return [*first, await ai.cached_gpt_query("alert")]
+
+    results = asyncio.run(run())
+    assert all(r.resolved for r in results)
+    assert queries == ["alert"]
+
+
+def test_cached_gpt_query_unresolved(queries):
+    async def run():
+        return [await ai.cached_gpt_query("rate limited"), await ai.cached_gpt_query("rate limited")]
+
+    results = asyncio.run(run())
+    assert not any(r.resolved for r in results)
+    assert queries == ["rate limited", "rate limited"]
+    assert not ai._query_cache
@@ -0,0 +1,73 @@
+import asyncio
+
+import gitlab
+import pytest
+
+from infra_agent.models.gl import GitlabFile
+from infra_agent.providers import gl
+
+
+class MockMergeRequest:
+    id = 81234
+    iid = 12
+    title = "Raise app memory limits"
+    description = ""
+    state = "opened"
+    target_branch = "main"
+    source_branch = "ai/fix-limits"
+
+    def changes(self, **kwargs):
+        return {
+            "changes": [
+                {"new_path": "releases/app/values.yaml", "deleted_file": False},
+                {"new_path": "releases/app/secrets.yaml", "deleted_file": False},
+                {"new_path": "releases/old/values.yaml", "deleted_file": True},
+            ]
+        }
+
+
+class MockMergeRequests:
+    def get(self, mr_id):
+        return MockMergeRequest()
+
+
+class MockProject:
+    mergerequests = MockMergeRequests()
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    """Serves `releases/app/values.yaml` only, records every path read"""
+    paths = []
+
+    async def get_file_contents(branch, file_path=""):
+        paths.append(file_path)
+        if file_path != "releases/app/values.yaml":
+            raise gitlab.exceptions.GitlabGetError("404 File Not Found", response_code=404)
+        return GitlabFile(file_path=file_path, file_name="values.yaml", ref=branch, content="replicas: 2\n")
+
+    monkeypatch.setattr(gl, "_project", MockProject)
+    monkeypatch.setattr(gl, "get_file_contents", get_file_contents)
+    return paths
+
+
+def test_list_files_in_merge_request(fetched):
+    files = asyncio.run(gl.list_files_in_merge_request(1))
+    assert files == {"releases/app/values.yaml": "replicas: 2\n"}
+    assert sorted(fetched) == ["releases/app/secrets.yaml", "releases/app/values.yaml"]
+
+
+def test_list_files_in_merge_request_error(fetched, monkeypatch):
+    async def get_file_contents(branch, file_path=""):
+        raise gitlab.exceptions.GitlabGetError("403 Forbidden", response_code=403)
+
+    monkeypatch.setattr(gl, "get_file_contents", get_file_contents)
+    with pytest.raises(gitlab.exceptions.GitlabGetError):
+        asyncio.run(gl.list_files_in_merge_request(1))
+
+
+def test_get_merge_request_details(monkeypatch):
+    monkeypatch.setattr(gl, "_project", MockProject)
+    mr = asyncio.run(gl.get_merge_request_details(12))
+    assert mr.id == 12
+    assert mr.source_branch == "ai/fix-limits"
@@ -0,0 +1,129 @@
+import asyncio
+
+import orjson
+import pytest
+
+from infra_agent.models.grafana import (
+    GrafanaPrometheusQueryOutput,
+    GrafanaWebhookPayload,
+    grafana_alert_summaries,
+)
+from infra_agent.providers import grafana
+
+_OUTPUT = GrafanaPrometheusQueryOutput.model_validate(
+    {
+        "status": "success",
+        "data": {"resultType": "matrix", "result": [{"metric": {}, "values": [[3600, "0.5"]]}]},
+    }
+)
+
+
+@pytest.fixture
+def fetches(monkeypatch):
+    """Replaces the Grafana round trip, records the arguments of every fetch"""
+    calls = []
+
+    async def fetch(promql, from_s, to_s, step):
+        calls.append((promql, from_s, to_s, step))
+        await asyncio.sleep(0.01)
+        return _OUTPUT
+
+    monkeypatch.setattr(grafana, "__fetch_prometheus_range", fetch)
+    grafana.clear_query_cache()
+    yield calls
+    grafana.clear_query_cache()
+
+
+def test_query_prometheus_range(fetches):
+    async def run():
+        first = await grafana.__query_prometheus_range("up", 0, 3600)
+        second = await grafana.__query_prometheus_range("up", 0, 3600)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is _OUTPUT
+    assert second is _OUTPUT
+    assert len(fetches) == 1
+    assert not grafana._query_inflight
+
+
+def test_query_prometheus_range_concurrent(fetches):
+    async def run():
+        return await asyncio.gather(
+            grafana.__query_prometheus_range("up", 0, 3600),
+            grafana.__query_prometheus_range("up", 0, 3600),
+        )
+
+    assert asyncio.run(run()) == [_OUTPUT, _OUTPUT]
+    assert len(fetches) == 1
+    assert not grafana._query_inflight
+
+
+def test_query_prometheus_range_failure(monkeypatch):
+    async def fetch(promql, from_s, to_s, step):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(grafana, "__fetch_prometheus_range", fetch)
+    grafana.clear_query_cache()
+
+    async def run():
+        return await asyncio.gather(
+            grafana.__query_prometheus_range("up", 0, 3600),
+            grafana.__query_prometheus_range("up", 0, 3600),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not grafana._query_inflight
+
+
+def test_grafana_alert_summaries():
+    labels = {"alertname": "PodCrashLooping", "namespace": "infra"}
+    payload = {
+        "receiver": "infra-agent",
+        "status": "resolved",
+        "title": "[RESOLVED] PodCrashLooping",
+        "message": "**Resolved**\nPodCrashLooping infra",
+        "groupLabels": {"alertname": "PodCrashLooping"},
+        "commonLabels": labels,
+        "commonAnnotations": {"runbook_url": "https://runbooks.example.com/PodCrashLooping"},
+        "alerts": [
+            {
+                "status": "resolved",
+                "labels": {**labels, "pod": "a"},
+                "annotations": {"summary": "a restarts", "runbook_url": "https://runbooks.example.com/PodCrashLooping"},
+            },
+            {"status": "firing", "labels": {**labels, "pod": "b"}, "annotations": {}, "values": {"B": 3}},
+        ],
+    }
+
+    summary = grafana_alert_summaries(orjson.dumps(payload))
+    assert summary == GrafanaWebhookPayload.model_validate(payload).summary()
+    assert summary["status"] == "resolved"
+    assert summary["title"] == "[RESOLVED] PodCrashLooping"
+    assert summary["message"] == payload["message"]
+    assert summary["group_labels"] == {"alertname": "PodCrashLooping"}
+    assert summary["common_labels"] == labels
+    assert summary["common_annotations"] == payload["commonAnnotations"]
+    assert [a["status"] for a in summary["alerts"]] == ["resolved", "firing"]
+    assert summary["alerts"][0]["annotations"]["runbook_url"] == "https://runbooks.example.com/PodCrashLooping"
+    assert "annotations" not in summary["alerts"][1]
+
+
+def test_query_prometheus_range_first_caller_cancelled(fetches):
+    async def run():
+        first = asyncio.create_task(grafana.__query_prometheus_range("up", 0, 3600))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(grafana.__query_prometheus_range("up", 0, 3600))
+        await asyncio.sleep(0)
+        first.cancel()
+        result = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return result
+
+    assert asyncio.run(run()) is _OUTPUT
+    assert len(fetches) == 1
+    assert not grafana._query_inflight
@@ -0,0 +1,143 @@
+import asyncio
+import base64
+import gzip
+
+import orjson
+import pytest
+from kubernetes_asyncio.client.exceptions import ApiException
+
+from infra_agent.models.generic import PromptToolError
+from infra_agent.models.k8s import KubernetesCapacity
+from infra_agent.providers import k8s
+
+
+class MockResponse:
+    """Raw (`_preload_content=False`) response as returned by the kubernetes_asyncio REST client"""
+
+    def __init__(self, status: int, reason: str, body: dict):
+        self.status = status
+        self.reason = reason
+        self.headers = {"Content-Type": "application/json"}
+        self._body = orjson.dumps(body)
+
+    async def read(self) -> bytes:
+        return self._body
+
+
+class MockApiClient:
+    def __init__(self, response: MockResponse):
+        self.response = response
+
+    async def call_api(self, *args, **kwargs):
+        return self.response
+
+
+_FORBIDDEN = MockResponse(
+    403,
+    "Forbidden",
+    {
+        "kind": "Status",
+        "apiVersion": "v1",
+        "status": "Failure",
+        "message": 'namespaces is forbidden: User "system:serviceaccount:infra:agent" cannot list resource',
+        "reason": "Forbidden",
+        "code": 403,
+    },
+)
+
+
+def _use_api_client(monkeypatch, response: MockResponse):
+    async def get_api():
+        return MockApiClient(response)
+
+    monkeypatch.setattr(k8s, "_get_api", get_api)
+
+
+def test_read_json_error_status():
+    with pytest.raises(ApiException) as exc_info:
+        asyncio.run(k8s._read_json(_FORBIDDEN))
+    assert exc_info.value.status == 403
+    assert exc_info.value.reason == "Forbidden"
+
+
+def test_list_namespaces_forbidden(monkeypatch):
+    _use_api_client(monkeypatch, _FORBIDDEN)
+    with pytest.raises(PromptToolError) as exc_info:
+        asyncio.run(k8s.list_namespaces())
+    assert isinstance(exc_info.value.__cause__, ApiException)
+    assert exc_info.value.__cause__.status == 403
+    assert not exc_info.value.retryable
+
+
+def test_list_namespaces(monkeypatch):
+    body = {"kind": "PartialObjectMetadataList", "metadata": {}, "items": [{"metadata": {"name": "default"}}]}
+    _use_api_client(monkeypatch, MockResponse(200, "OK", body))
+    assert asyncio.run(k8s.list_namespaces()).items == ["default"]
+
+
+def _helm_release_secret(release: dict) -> dict:
+    # the secret's data is base64 encoded by Kubernetes on top of Helm's own base64 of the gzipped release
+    release_b64 = base64.b64encode(base64.b64encode(gzip.compress(orjson.dumps(release))))
+    return {
+        "metadata": {
+            "name": f"sh.helm.release.v1.{release['name']}.v1",
+            "labels": {"owner": "helm", "name": release["name"], "version": "1"},
+            "creationTimestamp": "2026-01-01T00:00:00Z",
+        },
+        "data": {"release": release_b64.decode()},
+    }
+
+
+def test_get_helm_release_definition_instance_label_fallback(monkeypatch):
+    """The pod's instance label doesn't name the release, the narrowed selector finds nothing"""
+    release = {"name": "ingress", "chart": {"metadata": {"name": "ingress-nginx"}, "values": {"replicaCount": 1}}}
+    selectors = []
+
+    class MockCoreV1Api:
+        def __init__(self, api):
+            pass
+
+        async def read_namespaced_pod(self, name, namespace, **kwargs):
+            pod = {"metadata": {"name": name, "labels": {k8s.HELM_RELEASE_LABEL: "ingress-nginx"}}}
+            return MockResponse(200, "OK", pod)
+
+        async def list_namespaced_secret(self, namespace, label_selector, **kwargs):
+            selectors.append(label_selector)
+            items = [_helm_release_secret(release)] if label_selector == "owner=helm" else []
+            return MockResponse(200, "OK", {"kind": "SecretList", "items": items})
+
+    async def validate_namespace(namespace):
+        return True
+
+    async def iter_files_in_branch(branch, path="", recursive=False):
+        return
+        yield
+
+    _use_api_client(monkeypatch, None)
+    monkeypatch.setattr(k8s.client, "CoreV1Api", MockCoreV1Api)
+    monkeypatch.setattr(k8s, "_validate_namespace", validate_namespace)
+    monkeypatch.setattr(k8s, "iter_files_in_branch", iter_files_in_branch)
+
+    metadata = asyncio.run(k8s.get_helm_release_definition("ingress", "ingress-nginx-controller-0"))
+    assert metadata.name == "ingress"
+    assert metadata.chart_name == "ingress-nginx"
+    assert selectors == ["owner=helm,name=ingress-nginx", "owner=helm"]
+
+
+def test_kubernetes_capacity():
+    capacity = KubernetesCapacity.from_quantities(
+        {
+            "cpu": "3800m",
+            "memory": "129e6",
+            "pods": "110",
+            "ephemeral-storage": "100Gi",
+            "nvidia.com/gpu": "2",
+            "hugepages-2Mi": "0",
+        }
+    )
+    assert capacity.cpu == 3.8
+    assert capacity.memory == 129_000_000
+    assert capacity.pods == 110
+    assert capacity.ephemeral_storage == 100 * 1024**3
+    assert capacity.model_dump()["nvidia.com/gpu"] == "2"
+    assert capacity.model_dump()["hugepages-2Mi"] == "0"